@@ -0,0 +1,162 @@
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+import numpy as np
+
+from foil.models import Assignment
+from foil.models import Literal
+from foil.models import Mask
+from foil.unification import intern
+from foil.unification import is_variable
+from foil.unification import symbols
+from foil.unification import Variable
+
+
+class Table:
+
+    @staticmethod
+    def encode(assignments: Sequence[Assignment], variables: Sequence[Variable] = None) -> 'Table':
+        if variables is None:
+            variables = list(assignments[0]) if assignments else []
+        rows = [[intern(a[v]) for v in variables] for a in assignments]
+
+        return Table(variables, np.array(rows, dtype=np.int64).reshape(len(rows), len(variables)))
+
+    @staticmethod
+    def restore(variables: Sequence[Variable], values: List, codes: np.ndarray) -> 'Table':
+        lookup = np.array([intern(v) for v in values], dtype=np.int64)
+
+        return Table(variables, lookup[codes].reshape(codes.shape))
+
+    def __init__(self, variables: Sequence[Variable], rows: np.ndarray):
+        self._variables = tuple(variables)
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __reduce__(self):
+        unique, codes = np.unique(self._rows, return_inverse=True)
+        values = [symbols.value(s) for s in unique.tolist()]
+
+        return Table.restore, (self._variables, values, codes.reshape(self._rows.shape))
+
+    def __repr__(self) -> str:
+        return '<%s>[%d]' % (','.join(self._variables), len(self._rows))
+
+    @property
+    def variables(self) -> Tuple[Variable, ...]:
+        return self._variables
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows
+
+    def decode(self) -> List[Assignment]:
+        values = {s: symbols.value(s) for s in np.unique(self._rows).tolist()}
+
+        return [dict(zip(self._variables, (values[s] for s in row))) for row in self._rows.tolist()]
+
+    def project(self, variables: Sequence[Variable]) -> 'Table':
+        return Table(variables, self._rows[:, [self._variables.index(v) for v in variables]])
+
+    def select(self, indices: np.ndarray) -> 'Table':
+        return Table(self._variables, self._rows[indices])
+
+    def extend(self, literal: Literal, relation: np.ndarray) -> Tuple['Table', np.ndarray]:
+        relation, positions = restrict(literal, relation)
+        bound = [v for v in positions if v in self._variables]
+        fresh = [v for v in positions if v not in self._variables]
+        left, right = group(self.project(bound).rows, relation[:, [positions[v] for v in bound]])
+        if literal.negated:
+            origins = np.flatnonzero(~np.isin(left, right))
+            return self.select(origins), origins
+
+        if not fresh:
+            origins = np.flatnonzero(np.isin(left, right))
+            return self.select(origins), origins
+
+        order = np.argsort(right, kind='stable')
+        lower = np.searchsorted(right[order], left, 'left')
+        counts = np.searchsorted(right[order], left, 'right') - lower
+        origins = np.repeat(np.arange(len(self._rows)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        matches = order[np.repeat(lower, counts) + offsets]
+        rows = np.hstack([self._rows[origins], relation[matches][:, [positions[v] for v in fresh]]])
+
+        return Table([*self._variables, *fresh], rows), origins
+
+    def reach(self, relation: np.ndarray) -> int:
+        reach = 0
+        for column in self._rows.T:
+            for values in relation.T:
+                reach = max(reach, int(np.count_nonzero(np.isin(column, values))))
+
+        return reach
+
+    def covers(self, other: 'Table') -> np.ndarray:
+        left, right = group(self._rows, other.project(self._variables).rows)
+
+        return np.isin(left, right)
+
+
+def index(facts: Iterable[Literal]) -> Dict[Mask, np.ndarray]:
+    groups = {}
+    for fact in facts:
+        groups.setdefault(fact.get_mask(), []).append([intern(t) for t in fact.terms])
+
+    return {m: np.array(rows, dtype=np.int64).reshape(len(rows), m.arity) for m, rows in groups.items()}
+
+
+def encode(facts: Iterable[Literal], literal: Literal, domains: Sequence[Optional[Set]] = None) -> np.ndarray:
+    mask = literal.get_positive().get_mask()
+
+    return lookup(index(f for f in facts if f.get_mask() == mask), literal, domains)
+
+
+def lookup(relations: Dict[Mask, np.ndarray], literal: Literal, domains: Sequence[Optional[Set]] = None) -> np.ndarray:
+    mask = literal.get_positive().get_mask()
+    relation = relations.get(mask)
+    if relation is None:
+        relation = np.zeros((0, mask.arity), dtype=np.int64)
+    for i, domain in enumerate(domains or []):
+        if domain is not None:
+            relation = relation[np.isin(relation[:, i], [intern(v) for v in domain])]
+
+    return relation
+
+
+def update(relation: np.ndarray, added: np.ndarray, removed: np.ndarray) -> np.ndarray:
+    if len(removed):
+        left, right = group(relation, removed)
+        relation = relation[~np.isin(left, right)]
+
+    return np.concatenate([relation, added]) if len(added) else relation
+
+
+def restrict(literal: Literal, relation: np.ndarray) -> Tuple[np.ndarray, Dict[Variable, int]]:
+    keep, positions = np.ones(len(relation), dtype=bool), {}
+    for i, term in enumerate(literal.terms):
+        if not is_variable(term):
+            keep &= relation[:, i] == intern(term)
+        elif term in positions:
+            keep &= relation[:, i] == relation[:, positions[term]]
+        else:
+            positions[term] = i
+
+    return relation[keep], positions
+
+
+def group(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if not left.shape[1]:
+        return np.zeros(len(left), dtype=np.int64), np.zeros(len(right), dtype=np.int64)
+
+    _, inverse = np.unique(np.concatenate([left, right]), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    return inverse[:len(left)], inverse[len(left):]
@@ -0,0 +1,198 @@
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Tuple
+
+from foil.models import Clause
+from foil.models import Literal
+from foil.models import Mask
+from foil.models import Program
+from foil.unification import is_ground
+from foil.unification import Substitution
+from foil.utils import Tabling
+
+
+class Relation:
+
+    def __init__(self, facts: Iterable[Literal] = None):
+        self.facts = {}
+        self.indexes = {}
+        for fact in facts or []:
+            self.add(fact)
+
+    def __contains__(self, fact: Literal) -> bool:
+        return fact in self.facts
+
+    def __iter__(self):
+        return iter(self.facts)
+
+    def __len__(self) -> int:
+        return len(self.facts)
+
+    def add(self, fact: Literal) -> bool:
+        if fact in self.facts:
+            return False
+
+        self.facts[fact] = None
+        terms = list(fact.terms)
+        for positions, index in self.indexes.items():
+            index.setdefault(tuple(terms[p] for p in positions), []).append(fact)
+
+        return True
+
+    def index(self, positions: Tuple[int, ...]) -> Dict[Tuple, List[Literal]]:
+        index = self.indexes.get(positions)
+        if index is None:
+            index = self.indexes[positions] = {}
+            for fact in self.facts:
+                terms = list(fact.terms)
+                index.setdefault(tuple(terms[p] for p in positions), []).append(fact)
+
+        return index
+
+    def match(self, pattern: Literal) -> Iterable[Substitution]:
+        terms = list(pattern.terms)
+        positions = tuple(i for i, t in enumerate(terms) if is_ground(t))
+        if positions:
+            facts = self.index(positions).get(tuple(terms[p] for p in positions), [])
+        else:
+            facts = self.facts
+        for fact in list(facts):
+            subst = pattern.unify(fact)
+            if subst is not None:
+                yield subst
+
+
+Database = Dict[Mask, Relation]
+
+
+def stratify(rules: List[Clause]) -> List[List[Clause]]:
+    graph, negations = get_dependencies(rules)
+    result = []
+    for component in get_components(graph):
+        for head, mask in negations:
+            if head in component and mask in component:
+                raise ValueError('Negative cycle through %s and %s: not stratifiable' % (head, mask))
+
+        stratum = [r for r in rules if r.head.get_mask() in component]
+        if stratum:
+            result.append(stratum)
+
+    return result
+
+
+def get_dependencies(rules: List[Clause]) -> Tuple[Dict[Mask, Set[Mask]], Set[Tuple[Mask, Mask]]]:
+    graph, negations = {}, set()
+    for rule in rules:
+        graph.setdefault(rule.head.get_mask(), set()).update(l.get_positive().get_mask() for l in rule.body)
+        negations.update((rule.head.get_mask(), l.get_positive().get_mask()) for l in rule.body if l.negated)
+
+    return graph, negations
+
+
+def get_components(graph: Dict[Mask, Set[Mask]]) -> List[Set[Mask]]:
+    index, lowlinks, stack, components = {}, {}, [], []
+
+    def connect(mask: Mask):
+        index[mask] = lowlinks[mask] = len(index)
+        stack.append(mask)
+        for other in graph.get(mask, ()):
+            if other not in index:
+                connect(other)
+                lowlinks[mask] = min(lowlinks[mask], lowlinks[other])
+            elif other in stack:
+                lowlinks[mask] = min(lowlinks[mask], index[other])
+        if lowlinks[mask] == index[mask]:
+            component = set()
+            while mask not in component:
+                component.add(stack.pop())
+            components.append(component)
+
+    for mask in graph:
+        if mask not in index:
+            connect(mask)
+
+    return components
+
+
+def evaluate(rule: Clause, database: Database, delta: Tuple[int, Relation] = None) -> Iterable[Literal]:
+    def join(i: int, subst: Substitution) -> Iterable[Substitution]:
+        if i == len(body):
+            yield subst
+        elif body[i].negated:
+            positive = body[i].get_positive()
+            relation = database.get(positive.get_mask())
+            if not relation or next(relation.match(positive.substitute(subst)), None) is None:
+                yield from join(i + 1, subst)
+        else:
+            if delta is not None and delta[0] == i:
+                relation = delta[1]
+            else:
+                relation = database.get(body[i].get_mask())
+            if relation:
+                for subs in relation.match(body[i].substitute(subst)):
+                    yield from join(i + 1, {**subst, **subs})
+
+    body = order(rule.body)
+    for subst in join(0, {}):
+        yield rule.head.substitute(subst)
+
+
+def saturate(rules: List[Clause], database: Database):
+    for stratum in stratify(rules):
+        masks = {r.head.get_mask() for r in stratum}
+        deltas = {}
+        for rule in stratum:
+            for fact in evaluate(rule, database):
+                deltas.setdefault(fact.get_mask(), Relation()).add(fact)
+        deltas = commit(deltas, database)
+        while deltas:
+            deltas = commit(propagate(stratum, masks, deltas, database), database)
+
+
+def propagate(
+        stratum: List[Clause],
+        masks: Set[Mask],
+        deltas: Dict[Mask, Relation],
+        database: Database,
+) -> Dict[Mask, Relation]:
+    derived = {}
+    for rule in stratum:
+        for i, literal in enumerate(order(rule.body)):
+            delta = None
+            if not literal.negated and literal.get_mask() in masks:
+                delta = deltas.get(literal.get_mask())
+            if delta:
+                for fact in evaluate(rule, database, (i, delta)):
+                    derived.setdefault(fact.get_mask(), Relation()).add(fact)
+
+    return derived
+
+
+def commit(deltas: Dict[Mask, Relation], database: Database) -> Dict[Mask, Relation]:
+    result = {}
+    for mask, delta in deltas.items():
+        relation = database.setdefault(mask, Relation())
+        for fact in delta:
+            if relation.add(fact):
+                result.setdefault(mask, Relation()).add(fact)
+
+    return result
+
+
+def order(body: Iterable[Literal]) -> List[Literal]:
+    body = list(body)
+
+    return [*(l for l in body if not l.negated), *(l for l in body if l.negated)]
+
+
+@Tabling
+def ground(program: Program) -> List[Literal]:
+    database = {}
+    for fact in program.get_facts():
+        database.setdefault(fact.head.get_mask(), Relation()).add(fact.head)
+
+    saturate(list(program.get_rules()), database)
+
+    return [fact for relation in database.values() for fact in relation]
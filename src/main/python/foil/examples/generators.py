@@ -0,0 +1,65 @@
+from random import Random
+from typing import List
+from typing import Tuple
+
+from foil.models import Atom
+from foil.models import Clause
+from foil.models import Example
+from foil.models import Literal
+from foil.models import Program
+
+Task = Tuple[Literal, List[Clause], List[Example]]
+
+
+def get_graph(nodes: int, edges: int, seed: int = None) -> Task:
+    rng = Random(seed)
+
+    pairs = set()
+    while len(pairs) < min(edges, nodes * (nodes - 1) // 2):
+        source, target = sorted(rng.sample(range(nodes), 2))
+        pairs.add((source, target))
+    background = [Clause(Literal(Atom('edge', [s, t]))) for s, t in sorted(pairs)]
+
+    return get_task('path(X,Y)', background, [
+        'path(X,Y) :- edge(X,Y).',
+        'path(X,Y) :- edge(X,Z), path(Z,Y).',
+    ])
+
+
+def get_family(people: int, generations: int = 4, seed: int = None) -> Task:
+    rng = Random(seed)
+
+    size = max(2, people // max(1, generations))
+    layers = [['p%d_%d' % (g, i) for i in range(size)] for g in range(generations)]
+    background = []
+    for parents, children in zip(layers, layers[1:]):
+        fathers, mothers = parents[:len(parents) // 2], parents[len(parents) // 2:]
+        for child in children:
+            background.append(Clause(Literal(Atom('father', [rng.choice(fathers), child]))))
+            background.append(Clause(Literal(Atom('mother', [rng.choice(mothers), child]))))
+
+    return get_task('grandfather(X,Y)', background, [
+        'grandfather(X,Y) :- father(X,Z), father(Z,Y).',
+        'grandfather(X,Y) :- father(X,Z), mother(Z,Y).',
+    ])
+
+
+def get_relations(relations: int, tuples: int, constants: int, seed: int = None) -> Task:
+    rng = Random(seed)
+
+    background = []
+    for i in range(relations):
+        rows = {(rng.randrange(constants), rng.randrange(constants)) for _ in range(tuples)}
+        background.extend(Clause(Literal(Atom('r%d' % i, [a, b]))) for a, b in sorted(rows))
+
+    return get_task('goal(X,Y)', background, [
+        'goal(X,Y) :- r%d(X,Z), r%d(Z,Y).' % (0, min(1, relations - 1)),
+    ])
+
+
+def get_task(target: str, background: List[Clause], rules: List[str]) -> Task:
+    target = Literal.parse(target)
+    world = Program([*background, *Clause.parse_many(rules)]).ground()
+    examples = [Example(target.unify(f)) for f in world if f.get_mask() == target.get_mask()]
+
+    return target, background, examples
@@ -14,7 +14,27 @@ def program():
 
 
 def statement():
-    return [clause, example]
+    return [declaration, clause, example]
+
+
+def declaration():
+    return ':-', mask, '.'
+
+
+def mask():
+    return Optional(negation), functor, Optional('(', Optional(arguments), ')')
+
+
+def arguments():
+    return argument, ZeroOrMore(',', argument)
+
+
+def argument():
+    return [(mode, Optional(identifier)), identifier]
+
+
+def mode():
+    return ['+', '-']
 
 
 def example():
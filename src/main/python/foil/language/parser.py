@@ -0,0 +1,35 @@
+import threading
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+
+from arpeggio import ParserPython
+from arpeggio import visit_parse_tree
+
+from foil.language.grammar import comment
+from foil.language.visitor import FoilVisitor
+
+_local = threading.local()
+
+
+def get_parser(rule: Callable) -> ParserPython:
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+
+    parser = parsers.get(rule)
+    if parser is None:
+        parser = parsers[rule] = ParserPython(rule, comment_def=comment)
+
+    return parser
+
+
+def parse(rule: Callable, content: str) -> Any:
+    return visit_parse_tree(get_parser(rule).parse(content), FoilVisitor())
+
+
+def parse_many(rule: Callable, contents: Iterable[str]) -> List[Any]:
+    parser, visitor = get_parser(rule), FoilVisitor()
+
+    return [visit_parse_tree(parser.parse(content), visitor) for content in contents]
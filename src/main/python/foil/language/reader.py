@@ -0,0 +1,90 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+from typing import Optional
+from typing import TextIO
+from typing import Union
+
+from foil.models import Atom
+from foil.models import Clause
+from foil.models import Literal
+from foil.unification import Value
+
+SPACE = re.compile(r'(?:\s|%[^\n]*\n)*')
+BLANK = re.compile(r'(?:\s|%[^\n]*)*')
+STATEMENT = re.compile(r'''(?:"[^"]*"|'[^']*'|%[^\n]*\n|[^"'%.]|\.(?=\d))*\.(?!\d)''')
+FACT = re.compile(r'\s*([a-z][a-zA-Z_0-9]*)\s*(?:\(([^()"\'%~:]*)\))?\s*\.\s*')
+TERM = re.compile(r'(?i:(?P<boolean>true|false))|(?P<real>-?\d*\.\d+(?:E-?\d+)?)|(?P<integer>-?\d+)|'
+                  r'(?P<identifier>[a-z][a-zA-Z_0-9]*)')
+
+
+def split(stream: TextIO, size: int = 65536) -> Iterable[str]:
+    buffer, eof = '', False
+    while not eof:
+        chunk = stream.read(size)
+        eof = not chunk
+        buffer, position = buffer + chunk, 0
+        while True:
+            position = SPACE.match(buffer, position).end()
+            match = STATEMENT.match(buffer, position)
+            if match is None or match.end() == len(buffer) and not eof:
+                break
+
+            yield match.group()
+            position = match.end()
+        buffer = buffer[position:]
+
+    if not BLANK.fullmatch(buffer):
+        yield buffer
+
+
+def read_fact(statement: str) -> Optional[Clause]:
+    match = FACT.fullmatch(statement)
+    if match is None:
+        return None
+
+    functor, content = match.groups()
+    terms = []
+    if content is not None and content.strip():
+        for item in content.split(','):
+            term = read_term(item.strip())
+            if term is None:
+                return None
+
+            terms.append(term)
+
+    return Clause(Literal(Atom(functor, terms)))
+
+
+@lru_cache(maxsize=65536)
+def read_term(content: str) -> Optional[Value]:
+    match = TERM.fullmatch(content)
+    if match is None:
+        return None
+
+    if match.lastgroup == 'boolean':
+        return match.group().lower() == 'true'
+
+    if match.lastgroup == 'real':
+        return float(match.group())
+
+    if match.lastgroup == 'integer':
+        return int(match.group())
+
+    if re.match(r'(?i)true|false', match.group()):
+        return None
+
+    return match.group()
+
+
+def read(stream: TextIO, size: int = 65536) -> Iterable[Union['Mask', Clause, 'Example']]:
+    from foil.language.grammar import program
+    from foil.language.parser import parse
+
+    for statement in split(stream, size):
+        clause = read_fact(statement)
+        if clause is None:
+            result = parse(program, statement)
+            clause, *_ = [*result.declarations, *result.clauses]
+
+        yield clause
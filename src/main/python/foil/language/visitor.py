@@ -1,6 +1,8 @@
 import json
 import re
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from arpeggio import NonTerminal
@@ -16,13 +18,40 @@ class FoilVisitor(PTNodeVisitor):
         return node.value
 
     def visit_program(self, node: Node, children: List) -> 'Program':
+        from foil.models import Mask
         from foil.models import Program
 
-        return Program(children)
+        return Program([c for c in children if not isinstance(c, Mask)], [c for c in children if isinstance(c, Mask)])
 
-    def visit_statement(self, node: Node, children: List) -> Union['Clause', 'Example']:
+    def visit_statement(self, node: Node, children: List) -> Union['Mask', 'Clause', 'Example']:
         return children[0]
 
+    def visit_declaration(self, node: Node, children: List) -> 'Mask':
+        return children[0]
+
+    def visit_mask(self, node: Node, children: List) -> 'Mask':
+        from foil.models import Mask
+
+        negated = children[0] if isinstance(children[0], bool) else False
+        functor = children[1] if isinstance(children[0], bool) else children[0]
+        arguments = children[-1] if isinstance(children[-1], list) else []
+        modes = [m for m, _ in arguments]
+        types = [t for _, t in arguments]
+
+        return Mask(negated, functor, len(arguments), modes, types)
+
+    def visit_arguments(self, node: Node, children: List) -> List[Tuple[Optional[str], Optional[str]]]:
+        return [child for child in children]
+
+    def visit_argument(self, node: Node, children: List) -> Tuple[Optional[str], Optional[str]]:
+        if children[0] in ('+', '-'):
+            return children[0], children[1] if len(children) > 1 else None
+
+        return None, children[0]
+
+    def visit_mode(self, node: Node, children: List) -> str:
+        return node.value
+
     def visit_example(self, node: Node, children: List) -> 'Example':
         from foil.models import Example
 
@@ -1,10 +1,20 @@
 import math
+import os
 from collections import namedtuple
-from itertools import combinations
-from itertools import permutations
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+from itertools import product
+from random import Random
+from typing import ContextManager
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Set
 from typing import Tuple
 
 Hypothesis = namedtuple('Hypothesis', ['clause', 'positives'])
@@ -16,44 +26,198 @@ def get_closure(
         constants: List['Value'],
         world: List['Literal'],
         examples: List['Example'],
+        limit: int = None,
+        seed: int = None,
+        strategy: str = 'uniform',
 ) -> Tuple[List['Assignment'], List['Assignment']]:
     from foil.models import Label
-    from foil.unification import is_variable
 
-    positives, negatives = [], []
+    if strategy not in ('uniform', 'stratified', 'near-miss'):
+        raise ValueError("'strategy' must be either 'uniform', 'stratified' or 'near-miss': %s" % strategy)
+
+    variables = get_variables(target)
+    positives, negatives = {}, {}
     for example in examples:
-        if example.label == Label.POSITIVE and example.assignment not in positives:
-            positives.append(example.assignment)
-        if example.label == Label.NEGATIVE and example.assignment not in negatives:
-            negatives.append(example.assignment)
+        key = tuple(example.assignment.get(v) for v in variables)
+        if example.label == Label.POSITIVE:
+            positives.setdefault(key, example.assignment)
+        if example.label == Label.NEGATIVE:
+            negatives.setdefault(key, example.assignment)
+
+    domain = set(constants)
+    for fact in world:
+        subst = target.unify(fact)
+        if subst is not None:
+            key = tuple(subst.get(v) for v in variables)
+            if all(k in domain for k in key):
+                positives.setdefault(key, dict(zip(variables, key)))
+
+    rng = None if seed is None and limit is None and strategy == 'uniform' else Random(seed)
+    exclude = {*positives, *negatives}
+    generated = iter_negatives(variables, constants, exclude, rng, strategy, list(positives))
+    for assignment in islice(generated, limit):
+        negatives.setdefault(tuple(assignment.values()), assignment)
+
+    return list(positives.values()), list(negatives.values())
+
+
+def get_weight(
+        target: 'Literal',
+        constants: List['Value'],
+        positives: List['Assignment'],
+        negatives: List['Assignment'],
+) -> float:
+    if not negatives:
+        return 1.0
+
+    total = len(constants) ** len(get_variables(target)) - len(positives)
+
+    return max(1.0, total / len(negatives))
+
+
+def get_variables(target: 'Literal') -> List['Variable']:
+    from foil.unification import is_variable
 
     variables = []
     for term in target.terms:
         if is_variable(term) and term not in variables:
             variables.append(term)
-    n_variables = len(variables)
 
-    for combination in {c for c in combinations(constants * n_variables, n_variables)}:
-        assignment = dict(zip(variables, combination))
-        literal = target.substitute(assignment)
-        if literal in world and assignment not in positives:
-            positives.append(assignment)
-        if literal not in world and assignment not in positives and assignment not in negatives:
-            negatives.append(assignment)
+    return variables
+
+
+def iter_negatives(
+        variables: List['Variable'],
+        constants: List['Value'],
+        exclude: Set[Tuple['Value', ...]],
+        rng: Random = None,
+        strategy: str = 'uniform',
+        positives: List[Tuple['Value', ...]] = None,
+) -> Iterable['Assignment']:
+    if strategy == 'stratified':
+        candidates = iter_stratified(constants, len(variables), rng or Random())
+    elif strategy == 'near-miss':
+        candidates = iter_near_misses(constants, positives or [], rng or Random())
+    elif rng is None:
+        candidates = product(constants, repeat=len(variables))
+    else:
+        candidates = iter_sample(constants, len(variables), rng)
+
+    seen = {*exclude}
+    for combination in candidates:
+        if combination not in seen:
+            seen.add(combination)
+            yield dict(zip(variables, combination))
+
+
+def iter_sample(constants: List['Value'], arity: int, rng: Random) -> Iterable[Tuple['Value', ...]]:
+    for index in iter_indices(len(constants) ** arity, rng):
+        yield get_combination(constants, arity, index)
+
+
+def iter_stratified(constants: List['Value'], arity: int, rng: Random) -> Iterable[Tuple['Value', ...]]:
+    if not arity:
+        yield from iter_sample(constants, arity, rng)
+        return
+
+    size = len(constants) ** (arity - 1)
+    strata = {c: iter_indices(arity * size, rng) for c in constants}
+    while strata:
+        for constant in rng.sample(list(strata), len(strata)):
+            index = next(strata[constant], None)
+            if index is None:
+                del strata[constant]
+            else:
+                position, index = divmod(index, size)
+                rest = get_combination(constants, arity - 1, index)
+                yield (*rest[:position], constant, *rest[position:])
+
+
+def iter_near_misses(
+        constants: List['Value'],
+        positives: List[Tuple['Value', ...]],
+        rng: Random,
+) -> Iterable[Tuple['Value', ...]]:
+    def get_neighbours(key: Tuple['Value', ...]) -> Iterable[Tuple['Value', ...]]:
+        for index in iter_indices(len(key) * len(constants), rng):
+            position, index = divmod(index, len(constants))
+            yield (*key[:position], constants[index], *key[position + 1:])
+
+    neighbours = [get_neighbours(k) for k in positives]
+    while neighbours:
+        for generator in rng.sample(neighbours, len(neighbours)):
+            combination = next(generator, None)
+            if combination is None:
+                neighbours.remove(generator)
+            else:
+                yield combination
 
-    return positives, negatives
 
+def iter_indices(size: int, rng: Random) -> Iterable[int]:
+    seen = set()
+    while len(seen) < size:
+        index = rng.randrange(size)
+        if index not in seen:
+            seen.add(index)
+            yield index
+
+
+def get_combination(constants: List['Value'], arity: int, index: int) -> Tuple['Value', ...]:
+    combination = []
+    for _ in range(arity):
+        index, position = divmod(index, len(constants))
+        combination.append(constants[position])
+
+    return tuple(combination)
+
+
+def get_masks(literals: List['Literal'], declarations: List['Mask'] = None) -> List['Mask']:
+    declared = {d: d for d in declarations or []}
 
-def get_masks(literals: List['Literal']) -> List['Mask']:
     masks = []
     for literal in literals:
         mask = literal.get_mask()
         if mask not in masks:
-            masks.append(mask)
+            masks.append(declared.get(mask, mask))
 
     return masks
 
 
+def get_typing(literals: List['Literal'], masks: List['Mask']) -> Dict['Variable', str]:
+    from foil.unification import is_variable
+
+    types = {(m.functor, m.arity): m.types for m in masks if m.types}
+
+    typing = {}
+    for literal in literals:
+        for term, kind in zip(literal.terms, types.get((literal.functor, literal.get_arity()), ())):
+            if kind is not None and is_variable(term):
+                typing.setdefault(term, kind)
+
+    return typing
+
+
+def get_domains(world: List['Literal'], masks: List['Mask']) -> Dict['Mask', List[Optional[Set['Value']]]]:
+    kinds = {k for m in masks if m.types for k in m.types if k is not None}
+    values = get_values(world, kinds)
+
+    domains = {}
+    for mask in masks:
+        if mask.types and any(k in values for k in mask.types):
+            domains[mask] = [values.get(k) for k in mask.types]
+
+    return domains
+
+
+def get_values(world: List['Literal'], kinds: Set[str]) -> Dict[str, Set['Value']]:
+    values = {}
+    for fact in world:
+        if fact.functor in kinds and fact.get_arity() == 1 and not fact.negated:
+            values.setdefault(fact.functor, set()).update(fact.terms)
+
+    return values
+
+
 def get_constants(literals: List['Literal']) -> List['Value']:
     from foil.unification import is_ground
 
@@ -73,29 +237,54 @@ def foil(
         constants: List['Value'],
         positives: List['Assignment'],
         negatives: List['Assignment'],
+        workers: int = 0,
+        weight: float = 1.0,
+        tracer: 'Tracer' = None,
 ) -> List['Clause']:
-    hypotheses = []
-    while positives:
-        hypothesis = find_clause(hypotheses, target, background, masks, constants, positives, negatives)
-        if hypothesis is None:
-            break
+    from foil.models import Program
+    from foil.rete import build
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(background,))
+
+    try:
+        hypotheses, engine = [], build(Program(background))
+        while positives:
+            with get_phase(tracer, 'find_clause'):
+                hypothesis = find_clause(
+                    hypotheses, target, background, masks, constants, positives, negatives, engine, pool, weight,
+                    tracer,
+                )
+            if hypothesis is None:
+                break
+
+            if tracer is not None:
+                tracer.count('clauses')
+                tracer.on_clause(hypothesis)
 
-        positives = exclude(positives, hypothesis.positives)
-        hypotheses.append(hypothesis.clause)
+            positives = exclude(positives, hypothesis.positives)
+            hypotheses.append(hypothesis.clause)
+            engine.load(hypothesis.clause)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     return hypotheses
 
 
 def exclude(examples: List['Assignment'], examples_i: List['Assignment']) -> List['Assignment']:
+    from foil.coverage import Table
+
     if not examples:
         return []
 
     if not examples_i:
         return examples
 
-    coverage = [{k: v for k, v in e.items() if k in examples[0]} for e in examples_i]
+    coverage = Table.encode(examples).covers(Table.encode(examples_i))
 
-    return [e for e in examples if e not in coverage]
+    return [e for e, covered in zip(examples, coverage.tolist()) if not covered]
 
 
 def find_clause(
@@ -106,15 +295,32 @@ def find_clause(
         constants: List['Value'],
         positives: List['Assignment'],
         negatives: List['Assignment'],
+        engine: 'Engine' = None,
+        pool: Executor = None,
+        weight: float = 1.0,
+        tracer: 'Tracer' = None,
 ) -> Optional[Hypothesis]:
     from foil.models import Clause
+    from foil.models import Program
+    from foil.rete import build
+
+    if engine is None:
+        engine = build(Program([*hypotheses, *background]))
 
     body, positives, negatives = [], [*positives], [*negatives]
     while negatives:
-        candidate = find_literal(hypotheses, target, body, background, masks, constants, positives, negatives)
+        with get_phase(tracer, 'find_literal'):
+            candidate = find_literal(
+                hypotheses, target, body, background, masks, constants, positives, negatives, engine, pool, weight,
+                tracer,
+            )
         if candidate is None:
             break
 
+        if tracer is not None:
+            tracer.count('literals')
+            tracer.on_literal(candidate)
+
         positives = candidate.positives
         negatives = candidate.negatives
         body.append(candidate.literal)
@@ -134,26 +340,285 @@ def find_literal(
         constants: List['Value'],
         positives: List['Assignment'],
         negatives: List['Assignment'],
+        engine: 'Engine' = None,
+        pool: Executor = None,
+        weight: float = 1.0,
+        tracer: 'Tracer' = None,
 ) -> Optional[Candidate]:
+    from foil.coverage import index
+    from foil.coverage import lookup
+    from foil.coverage import Table
+    from foil.models import Program
+    from foil.rete import build
+
+    if engine is None:
+        engine = build(Program([*hypotheses, *background]))
+
+    table, world = get_table([target, *body]), engine.facts
+    pos, neg = Table.encode(positives, table.values()), Table.encode(negatives, table.values())
+    affected = get_dependents(target, [*hypotheses, *background])
+    typing, domains, relations = get_typing([target, *body], masks), get_domains(world, masks), index(world)
+    with get_phase(tracer, 'generate'):
+        groups = get_groups(table, masks, affected, typing)
+
+    scores = {}
+    if pool is not None:
+        with get_phase(tracer, 'pool'):
+            scores = get_scores(
+                pool, target, body, hypotheses, pos, neg, masks, groups, affected, domains, weight, tracer,
+            )
+
+    candidate, scored = find_best(
+        engine, target, body, pos, neg, masks, groups, affected, relations, domains, scores, weight, tracer,
+    )
+
+    if tracer is not None:
+        generated = sum(len(group) for group in groups)
+        tracer.count('candidates.generated', generated)
+        tracer.count('candidates.scored', scored)
+        tracer.count('candidates.pruned', generated - scored)
+
+    if candidate is None:
+        return None
+
+    if candidate.positives is None:
+        domain = domains.get(candidate.literal.get_mask())
+        relation = lookup(relations, candidate.literal, domain)
+        candidate = get_candidate(engine, target, body, pos, neg, candidate.literal, relation, weight, domain, tracer)
+
+    if tracer is not None:
+        tracer.count('extend.rows', len(candidate.positives) + len(candidate.negatives))
+
+    return Candidate(candidate.score, candidate.literal, candidate.positives.decode(), candidate.negatives.decode())
+
+
+def get_groups(
+        table: Dict[int, 'Variable'],
+        masks: List['Mask'],
+        affected: Set[Tuple[str, int]],
+        typing: Dict['Variable', str],
+) -> List[List['Literal']]:
     from foil.models import Atom
-    from foil.models import Clause
     from foil.models import Literal
+
+    return [
+        [Literal(Atom(m.functor, items), m.negated) for items in itemize(table, m.arity, get_modes(m), m.types, typing)]
+        if not m.negated or (m.functor, m.arity) not in affected else []
+        for m in masks
+    ]
+
+
+def get_scores(
+        pool: Executor,
+        target: 'Literal',
+        body: List['Literal'],
+        hypotheses: List['Clause'],
+        pos: 'Table',
+        neg: 'Table',
+        masks: List['Mask'],
+        groups: List[List['Literal']],
+        affected: Set[Tuple[str, int]],
+        domains: Dict['Mask', List[Optional[Set['Value']]]],
+        weight: float = 1.0,
+        tracer: 'Tracer' = None,
+) -> Dict['Literal', float]:
+    literals = [l for m, group in zip(masks, groups) if (m.functor, m.arity) in affected for l in group]
+    chunksize = max(1, math.ceil(len(literals) / (4 * (os.cpu_count() or 1))))
+    score = partial(get_score, target, body, hypotheses, pos, neg, weight, domains, tracer is not None)
+
+    scores = {}
+    for literal, (result, counters) in zip(literals, pool.map(score, literals, chunksize=chunksize)):
+        scores[literal] = result
+        if tracer is not None:
+            tracer.counters.update(counters)
+
+    return scores
+
+
+def find_best(
+        engine: 'Engine',
+        target: 'Literal',
+        body: List['Literal'],
+        pos: 'Table',
+        neg: 'Table',
+        masks: List['Mask'],
+        groups: List[List['Literal']],
+        affected: Set[Tuple[str, int]],
+        relations: Dict['Mask', 'np.ndarray'],
+        domains: Dict['Mask', List[Optional[Set['Value']]]],
+        scores: Dict['Literal', float],
+        weight: float = 1.0,
+        tracer: 'Tracer' = None,
+) -> Tuple[Optional[Candidate], int]:
+    from foil.coverage import lookup
+
+    candidate, bound, scored = None, bound_gain(len(pos), len(pos), len(neg) * weight), 0
+    for mask, group in zip(masks, groups):
+        if candidate and bound <= candidate.score:
+            break
+
+        if not group:
+            continue
+
+        domain, derived = domains.get(mask), (mask.functor, mask.arity) in affected
+        relation = lookup(relations, group[0], domain)
+        if candidate and not derived and not mask.negated:
+            if bound_gain(pos.reach(relation), len(pos), len(neg) * weight) <= candidate.score:
+                continue
+
+        candidate, count = score_group(
+            engine, target, body, pos, neg, group, relation, derived, scores, weight, domain, candidate, bound, tracer,
+        )
+        scored += count
+
+    return candidate, scored
+
+
+def score_group(
+        engine: 'Engine',
+        target: 'Literal',
+        body: List['Literal'],
+        pos: 'Table',
+        neg: 'Table',
+        group: List['Literal'],
+        relation: 'np.ndarray',
+        derived: bool,
+        scores: Dict['Literal', float],
+        weight: float = 1.0,
+        domains: List[Optional[Set['Value']]] = None,
+        candidate: Candidate = None,
+        bound: float = math.inf,
+        tracer: 'Tracer' = None,
+) -> Tuple[Optional[Candidate], int]:
+    scored = 0
+    for literal in group:
+        if candidate and bound <= candidate.score:
+            break
+
+        if literal in scores:
+            result = Candidate(scores[literal], literal, None, None)
+        elif derived:
+            result = get_candidate(engine, target, body, pos, neg, literal, relation, weight, domains, tracer)
+        else:
+            best = candidate.score if candidate else None
+            result = score_literal(pos, neg, literal, relation, weight, best)
+
+        if result is not None:
+            scored += 1
+            if candidate is None or result.score > candidate.score:
+                candidate = result
+
+    return candidate, scored
+
+
+def get_modes(mask: 'Mask') -> Optional[Tuple[str, ...]]:
+    return ('+',) * mask.arity if mask.negated else mask.modes
+
+
+def get_phase(tracer: Optional['Tracer'], name: str) -> ContextManager:
+    return nullcontext() if tracer is None else tracer.phase(name)
+
+
+def get_dependents(target: 'Literal', clauses: List['Clause']) -> Set[Tuple[str, int]]:
+    dependents, size = {(target.functor, target.get_arity())}, 0
+    while size < len(dependents):
+        size = len(dependents)
+        for clause in clauses:
+            if any((literal.functor, literal.get_arity()) in dependents for literal in clause.body):
+                dependents.add((clause.head.functor, clause.head.get_arity()))
+
+    return dependents
+
+
+def get_candidate(
+        engine: 'Engine',
+        target: 'Literal',
+        body: List['Literal'],
+        pos: 'Table',
+        neg: 'Table',
+        literal: 'Literal',
+        relation: 'np.ndarray',
+        weight: float = 1.0,
+        domains: List[Optional[Set['Value']]] = None,
+        tracer: 'Tracer' = None,
+) -> Candidate:
+    from foil.coverage import encode
+    from foil.coverage import update
+    from foil.models import Clause
+
+    with get_phase(tracer, 'derive'):
+        delta = engine.derive(Clause(target, [*body, literal]))
+    if tracer is not None:
+        tracer.count('ground')
+        tracer.count('facts.derived', len(delta.added))
+
+    relation = update(relation, encode(delta.added, literal, domains), encode(delta.removed, literal, domains))
+
+    return score_literal(pos, neg, literal, relation, weight)
+
+
+def score_literal(
+        pos: 'Table',
+        neg: 'Table',
+        literal: 'Literal',
+        relation: 'np.ndarray',
+        weight: float = 1.0,
+        score: float = None,
+) -> Optional[Candidate]:
+    pos_i, origins = pos.extend(literal, relation)
+    t = len(set(origins.tolist()))
+    if score is not None and bound_gain(t, len(pos), len(neg) * weight) <= score:
+        return None
+
+    neg_i, _ = neg.extend(literal, relation)
+    score = score_gain(t, len(pos), len(neg) * weight, len(pos_i), len(neg_i) * weight)
+
+    return Candidate(score, literal, pos_i, neg_i)
+
+
+_worker = {}
+
+
+def init_worker(background: List['Clause']):
+    from foil.coverage import index
     from foil.models import Program
+    from foil.rete import build
 
-    candidate, table, bound = None, get_table([target, *body]), max_gain(positives, negatives)
-    for mask in masks:
-        for items in itemize(table, mask.arity):
-            literal = Literal(Atom(mask.functor, items), mask.negated)
-            world = Program([*hypotheses, Clause(target, [*body, literal]), *background]).ground()
-            positives_i = extend(positives, literal, constants, world)
-            negatives_i = extend(negatives, literal, constants, world)
-            score = gain(positives, negatives, positives_i, negatives_i)
-            if candidate and bound < candidate.score:
-                break
-            if candidate is None or score > candidate.score:
-                candidate = Candidate(score, literal, positives_i, negatives_i)
+    _worker['engine'] = build(Program(background))
+    _worker['hypotheses'] = []
+    _worker['relations'] = index(_worker['engine'].facts)
 
-    return candidate
+
+def get_score(
+        target: 'Literal',
+        body: List['Literal'],
+        hypotheses: List['Clause'],
+        pos: 'Table',
+        neg: 'Table',
+        weight: float,
+        domains: Dict['Mask', List[Optional[Set['Value']]]],
+        traced: bool,
+        literal: 'Literal',
+) -> Tuple[float, Dict[str, int]]:
+    from foil.coverage import index
+    from foil.coverage import lookup
+    from foil.tracing import Tracer
+
+    engine = _worker['engine']
+    if _worker['hypotheses'] != hypotheses:
+        for clause in _worker['hypotheses']:
+            if clause not in hypotheses:
+                engine.unload(clause)
+        for clause in hypotheses:
+            engine.load(clause)
+        _worker['hypotheses'] = [*hypotheses]
+        _worker['relations'] = index(engine.facts)
+
+    tracer, domain = Tracer() if traced else None, domains.get(literal.get_mask())
+    relation = lookup(_worker['relations'], literal, domain)
+    candidate = get_candidate(engine, target, body, pos, neg, literal, relation, weight, domain, tracer)
+
+    return candidate.score, dict(tracer.counters) if tracer is not None else {}
 
 
 def max_gain(pos: List['Assignment'], neg: List['Assignment']) -> float:
@@ -178,30 +643,95 @@ def get_table(literals: List['Literal']) -> Dict[int, 'Variable']:
     return {i: v for i, v in enumerate(variables)}
 
 
-def itemize(table: Dict[int, 'Variable'], arity: int) -> List[List['Variable']]:
-    size = len(table)
-    values = [v for v in range(arity + size)]
-
-    signatures = []
-    for combination in {c for c in combinations(values * arity, arity)}:
-        if any(position < size for position in combination):
-            signature = get_signature(table, combination)
-            if signature not in signatures:
-                signatures.append(signature)
-
-    return signatures
-
-
-def get_signature(table: Dict[int, 'Variable'], combination: Tuple[int, ...]) -> List['Variable']:
-    signature, i, table = [], 0, {**table}
-    for index in combination:
-        if index not in table:
-            while ('V%d' % i) in table.values():
-                i += 1
-            table[index] = 'V%d' % i
-        signature.append(table[index])
-
-    return signature
+def itemize(
+        table: Dict[int, 'Variable'],
+        arity: int,
+        modes: Sequence[Optional[str]] = None,
+        types: Sequence[Optional[str]] = None,
+        typing: Dict['Variable', str] = None,
+) -> List[List['Variable']]:
+    return list(iter_signatures(table, arity, modes, types, typing))
+
+
+def iter_signatures(
+        table: Dict[int, 'Variable'],
+        arity: int,
+        modes: Sequence[Optional[str]] = None,
+        types: Sequence[Optional[str]] = None,
+        typing: Dict['Variable', str] = None,
+) -> Iterable[List['Variable']]:
+    olds, news = list(table.values()), get_names(table, arity)
+    modes, types = modes or (None,) * arity, types or (None,) * arity
+
+    yield from expand_signature(olds, news, modes, types, typing or {}, [], {}, False)
+
+
+def expand_signature(
+        olds: List['Variable'],
+        news: List['Variable'],
+        modes: Sequence[Optional[str]],
+        types: Sequence[Optional[str]],
+        typing: Dict['Variable', str],
+        signature: List['Variable'],
+        kinds: Dict['Variable', Optional[str]],
+        bound: bool,
+) -> Iterable[List['Variable']]:
+    position = len(signature)
+    if position == len(modes):
+        if bound:
+            yield signature
+        return
+
+    if modes[position] != '-':
+        yield from expand_olds(olds, news, modes, types, typing, signature, kinds)
+    if modes[position] != '+':
+        yield from expand_news(olds, news, modes, types, typing, signature, kinds, bound)
+
+
+def expand_olds(
+        olds: List['Variable'],
+        news: List['Variable'],
+        modes: Sequence[Optional[str]],
+        types: Sequence[Optional[str]],
+        typing: Dict['Variable', str],
+        signature: List['Variable'],
+        kinds: Dict['Variable', Optional[str]],
+) -> Iterable[List['Variable']]:
+    kind = types[len(signature)]
+    for variable in olds:
+        if kind is None or typing.get(variable) in (None, kind):
+            yield from expand_signature(olds, news, modes, types, typing, [*signature, variable], kinds, True)
+
+
+def expand_news(
+        olds: List['Variable'],
+        news: List['Variable'],
+        modes: Sequence[Optional[str]],
+        types: Sequence[Optional[str]],
+        typing: Dict['Variable', str],
+        signature: List['Variable'],
+        kinds: Dict['Variable', Optional[str]],
+        bound: bool,
+) -> Iterable[List['Variable']]:
+    kind, fresh = types[len(signature)], len(kinds)
+    for variable in news[:fresh]:
+        if kind is None or kinds[variable] in (None, kind):
+            yield from expand_signature(olds, news, modes, types, typing, [*signature, variable], kinds, bound)
+    if fresh < len(news):
+        variable = news[fresh]
+        yield from expand_signature(
+            olds, news, modes, types, typing, [*signature, variable], {**kinds, variable: kind}, bound,
+        )
+
+
+def get_names(table: Dict[int, 'Variable'], size: int) -> List['Variable']:
+    names, used, i = [], set(table.values()), 0
+    while len(names) < size:
+        if ('V%d' % i) not in used:
+            names.append('V%d' % i)
+        i += 1
+
+    return names
 
 
 def extend(
@@ -209,20 +739,23 @@ def extend(
         literal: 'Literal',
         constants: List['Value'],
         world: List['Literal'],
+        domains: List[Optional[Set['Value']]] = None,
+        tracer: 'Tracer' = None,
 ) -> List['Assignment']:
-    from foil.unification import is_variable
+    from foil.coverage import encode
+    from foil.coverage import Table
 
     if not examples:
         return []
 
-    variables = {v for v in literal.terms if is_variable(v) and v not in examples[0]}
-    if not variables:
-        return [e for e in examples if literal.substitute(e) in world]
+    table, origins = Table.encode(examples).extend(literal, encode(world, literal, domains))
+    if tracer is not None:
+        tracer.count('extend')
+        tracer.count('extend.rows', len(table))
+    if len(table.variables) == len(examples[0]):
+        return [examples[i] for i in origins.tolist()]
 
-    size = len(variables)
-    additions = [dict(zip(variables, v)) for v in set(permutations(constants * size, size))]
-
-    return [{**e, **a} for e in examples for a in additions if literal.substitute({**e, **a}) in world]
+    return table.decode()
 
 
 def gain(
@@ -232,27 +765,41 @@ def gain(
     if not pos and not neg or not pos_i and not neg_i:
         return -1
 
-    t = len(covers(pos, pos_i))
-    e = entropy(len(pos), len(neg))
-    e_i = entropy(len(pos_i), len(neg_i), True)
+    return score_gain(len(covers(pos, pos_i)), len(pos), len(neg), len(pos_i), len(neg_i))
+
+
+def bound_gain(t: int, pos: int, neg: float) -> float:
+    if not pos:
+        return math.inf
+
+    return t * (entropy(pos, neg) - entropy(1, 0, True))
+
+
+def score_gain(t: int, pos: int, neg: float, pos_i: int, neg_i: float) -> float:
+    if not pos and not neg or not pos_i and not neg_i:
+        return -1
+
+    e = entropy(pos, neg)
+    e_i = entropy(pos_i, neg_i, True)
 
     return t * (e - e_i)
 
 
 def covers(examples: List['Assignment'], examples_i: List['Assignment']) -> List['Assignment']:
+    from foil.coverage import Table
+
     if not examples:
         return []
 
     if not examples_i:
         return examples
 
-    variables = examples[0].keys()
-    coverage = [{k: v for k, v in e.items() if k in variables} for e in examples_i]
+    coverage = Table.encode(examples).covers(Table.encode(examples_i))
 
-    return [e for e in examples if e in coverage]
+    return [e for e, covered in zip(examples, coverage.tolist()) if covered]
 
 
-def entropy(pos: int, neg: int, extra: bool = False) -> float:
+def entropy(pos: int, neg: float, extra: bool = False) -> float:
     if pos == 0:
         return math.inf
 
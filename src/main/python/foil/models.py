@@ -1,14 +1,15 @@
 from enum import Enum
+from os import PathLike
 from typing import Dict
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import TextIO
+from typing import Tuple
+from typing import Union
 
-from arpeggio import ParserPython
-from arpeggio import visit_parse_tree
-
-from foil.language.visitor import FoilVisitor
 from foil.unification import Derivation
+from foil.unification import intern
 from foil.unification import is_ground
 from foil.unification import is_variable
 from foil.unification import normalize
@@ -21,14 +22,39 @@ from foil.unification import Variable
 
 
 class Mask:
+    __slots__ = ('_negated', '_functor', '_arity', '_modes', '_types', '_hash')
 
-    def __init__(self, negated: bool, functor: str, arity: int):
+    @staticmethod
+    def parse(content: str) -> 'Mask':
+        from foil.language.grammar import mask
+        from foil.language.parser import parse
+
+        return parse(mask, content)
+
+    def __init__(
+            self,
+            negated: bool,
+            functor: str,
+            arity: int,
+            modes: Iterable[Optional[str]] = None,
+            types: Iterable[Optional[str]] = None,
+    ):
         self._negated = negated
         self._functor = functor
         self._arity = arity
+        self._modes = None if modes is None else tuple(modes)
+        self._types = None if types is None else tuple(types)
+        self._hash = hash((negated, functor, arity))
+        if self._modes is not None and len(self._modes) != arity:
+            raise ValueError("'modes' must have one entry per argument: %s" % (self._modes,))
+        if self._types is not None and len(self._types) != arity:
+            raise ValueError("'types' must have one entry per argument: %s" % (self._types,))
+
+    def __reduce__(self):
+        return Mask, (self._negated, self._functor, self._arity, self._modes, self._types)
 
     def __hash__(self) -> int:
-        return hash((self._negated, self._functor, self._arity))
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Mask):
@@ -43,10 +69,16 @@ class Mask:
         return self._functor == other._functor
 
     def __repr__(self) -> str:
+        if self._modes is None and self._types is None:
+            descriptor = '%s/%d' % (self._functor, self._arity)
+        else:
+            modes, types = self._modes or [None] * self._arity, self._types or [None] * self._arity
+            descriptor = '%s(%s)' % (self._functor, ','.join('%s%s' % (m or '', t or '') for m, t in zip(modes, types)))
+
         if self._negated:
-            return '~%s/%d' % (self._functor, self._arity)
+            return '~%s' % descriptor
 
-        return '%s/%d' % (self._functor, self._arity)
+        return descriptor
 
     @property
     def negated(self) -> bool:
@@ -60,40 +92,52 @@ class Mask:
     def arity(self) -> int:
         return self._arity
 
+    @property
+    def modes(self) -> Optional[Tuple[Optional[str], ...]]:
+        return self._modes
+
+    @property
+    def types(self) -> Optional[Tuple[Optional[str], ...]]:
+        return self._types
+
+    def is_declared(self) -> bool:
+        return self._modes is not None or self._types is not None
+
 
 class Atom:
+    __slots__ = ('_functor', '_terms', '_key', '_hash')
 
     @staticmethod
     def parse(content: str) -> 'Atom':
         from foil.language.grammar import atom
-        from foil.language.grammar import comment
+        from foil.language.parser import parse
 
-        parser = ParserPython(atom, comment_def=comment)
-        parse_tree = parser.parse(content)
-        return visit_parse_tree(parse_tree, FoilVisitor())
+        return parse(atom, content)
+
+    @staticmethod
+    def parse_many(contents: Iterable[str]) -> List['Atom']:
+        from foil.language.grammar import atom
+        from foil.language.parser import parse_many
 
-    def __init__(self, functor: str, terms: List[Term] = None):
+        return parse_many(atom, contents)
+
+    def __init__(self, functor: str, terms: Iterable[Term] = None):
         self._functor = functor
-        self._terms = terms or []
+        self._terms = tuple(terms or ())
+        self._key = (intern(functor), *(intern(term) for term in self._terms))
+        self._hash = hash(self._key)
+
+    def __reduce__(self):
+        return Atom, (self._functor, self._terms)
 
     def __hash__(self) -> int:
-        return hash((self._functor, *self._terms))
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Atom):
             return False
 
-        if normalize(self._functor) != normalize(other._functor):
-            return False
-
-        if len(self._terms) != len(other._terms):
-            return False
-
-        for i, term in enumerate(self._terms):
-            if normalize(term) != normalize(other._terms[i]):
-                return False
-
-        return True
+        return self._key == other._key
 
     def __repr__(self) -> str:
         if not self._terms:
@@ -106,7 +150,7 @@ class Atom:
         return self._functor
 
     @property
-    def terms(self) -> Iterable[Term]:
+    def terms(self) -> Tuple[Term, ...]:
         return self._terms
 
     def get_arity(self) -> int:
@@ -119,10 +163,10 @@ class Atom:
         if not isinstance(other, Atom):
             return None
 
-        if normalize(self._functor) != normalize(other._functor):
+        if self._key[0] != other._key[0]:
             return None
 
-        if len(self._terms) != len(other._terms):
+        if len(self._key) != len(other._key):
             return None
 
         subst = {}
@@ -134,28 +178,41 @@ class Atom:
         return simplify(subst)
 
     def substitute(self, subst: Substitution) -> 'Atom':
+        if not subst:
+            return self
+
         terms = [subst.get(term, term) if is_variable(term) else term for term in self._terms]
 
         return Atom(self._functor, terms)
 
 
 class Literal:
+    __slots__ = ('_negated', '_atom', '_hash')
 
     @staticmethod
     def parse(content: str) -> 'Literal':
         from foil.language.grammar import literal
-        from foil.language.grammar import comment
+        from foil.language.parser import parse
+
+        return parse(literal, content)
+
+    @staticmethod
+    def parse_many(contents: Iterable[str]) -> List['Literal']:
+        from foil.language.grammar import literal
+        from foil.language.parser import parse_many
 
-        parser = ParserPython(literal, comment_def=comment)
-        parse_tree = parser.parse(content)
-        return visit_parse_tree(parse_tree, FoilVisitor())
+        return parse_many(literal, contents)
 
     def __init__(self, atom: Atom, negated: bool = False):
         self._negated = negated
         self._atom = atom
+        self._hash = hash((negated, atom))
+
+    def __reduce__(self):
+        return Literal, (self._atom, self._negated)
 
     def __hash__(self) -> int:
-        return hash((self._negated, self._atom))
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Literal):
@@ -181,7 +238,7 @@ class Literal:
         return self._atom.functor
 
     @property
-    def terms(self) -> Iterable[Term]:
+    def terms(self) -> Tuple[Term, ...]:
         return self._atom.terms
 
     def get_arity(self) -> int:
@@ -193,6 +250,9 @@ class Literal:
     def get_mask(self) -> Mask:
         return Mask(self._negated, self.functor, self.get_arity())
 
+    def get_positive(self) -> 'Literal':
+        return Literal(self._atom) if self._negated else self
+
     def is_ground(self) -> bool:
         return self._atom.is_ground()
 
@@ -206,42 +266,48 @@ class Literal:
         return self._atom.unify(other._atom)
 
     def substitute(self, substitution: Substitution) -> 'Literal':
+        if not substitution:
+            return self
+
         return Literal(self._atom.substitute(substitution), self._negated)
 
 
 class Clause:
+    __slots__ = ('_head', '_body', '_hash')
 
     @staticmethod
     def parse(content: str) -> 'Clause':
         from foil.language.grammar import clause
-        from foil.language.grammar import comment
+        from foil.language.parser import parse
+
+        return parse(clause, content)
+
+    @staticmethod
+    def parse_many(contents: Iterable[str]) -> List['Clause']:
+        from foil.language.grammar import clause
+        from foil.language.parser import parse_many
 
-        parser = ParserPython(clause, comment_def=comment)
-        parse_tree = parser.parse(content)
-        return visit_parse_tree(parse_tree, FoilVisitor())
+        return parse_many(clause, contents)
 
-    def __init__(self, head: Literal, body: List[Literal] = None):
+    def __init__(self, head: Literal, body: Iterable[Literal] = None):
         self._head = head
-        self._body = body or []
+        self._body = tuple(body or ())
+        self._hash = hash((head, *self._body))
+
+    def __reduce__(self):
+        return Clause, (self._head, self._body)
 
     def __hash__(self) -> int:
-        return hash((self._head, *self._body))
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Clause):
             return False
 
-        if self._head != other._head:
+        if self._hash != other._hash:
             return False
 
-        if len(self._body) != len(other._body):
-            return False
-
-        for i, literal in enumerate(self._body):
-            if literal != other._body[i]:
-                return False
-
-        return True
+        return self._head == other._head and self._body == other._body
 
     def __repr__(self) -> str:
         if self._body:
@@ -254,7 +320,7 @@ class Clause:
         return self._head
 
     @property
-    def body(self) -> Iterable[Literal]:
+    def body(self) -> Tuple[Literal, ...]:
         return self._body
 
     @property
@@ -273,20 +339,51 @@ class Clause:
     def substitute(self, substitution: Substitution) -> 'Clause':
         return Clause(self._head.substitute(substitution), [l.substitute(substitution) for l in self._body])
 
+    def normalize(self) -> 'Clause':
+        names = {}
+        for literal in self.literals:
+            for term in literal.terms:
+                if is_variable(term) and term not in names:
+                    names[term] = 'V%d' % len(names)
+
+        return self.substitute(names) if names else self
+
 
 class Program:
 
     @staticmethod
     def parse(content: str) -> 'Program':
         from foil.language.grammar import program
-        from foil.language.grammar import comment
+        from foil.language.parser import parse
+
+        return parse(program, content)
+
+    @staticmethod
+    def parse_many(contents: Iterable[str]) -> List['Program']:
+        from foil.language.grammar import program
+        from foil.language.parser import parse_many
 
-        parser = ParserPython(program, comment_def=comment)
-        parse_tree = parser.parse(content)
-        return visit_parse_tree(parse_tree, FoilVisitor())
+        return parse_many(program, contents)
 
-    def __init__(self, clauses: List[Clause] = None):
+    @staticmethod
+    def iter_parse(
+            source: Union[str, PathLike, TextIO],
+            size: int = 65536,
+    ) -> Iterable[Union[Mask, Clause, 'Example']]:
+        from foil.language.reader import read
+
+        if isinstance(source, (str, PathLike)):
+            with open(source) as stream:
+                yield from read(stream, size)
+        else:
+            yield from read(source, size)
+
+    def __init__(self, clauses: List[Clause] = None, declarations: List[Mask] = None):
         self._clauses = clauses or []
+        self._declarations = declarations or []
+        self._index = None
+        self._arguments = {}
+        self._resolver = None
 
     def __hash__(self) -> int:
         return hash(tuple(self._clauses))
@@ -301,15 +398,56 @@ class Program:
         return all(c in other._clauses for c in self._clauses)
 
     def __repr__(self) -> str:
-        return '\n'.join(repr(c) for c in self._clauses)
+        return '\n'.join([*(':- %s.' % repr(d) for d in self._declarations), *(repr(c) for c in self._clauses)])
 
     @property
     def clauses(self) -> Iterable[Clause]:
         return self._clauses
 
+    @property
+    def declarations(self) -> Iterable[Mask]:
+        return self._declarations
+
     def get_clause(self, index: int) -> Optional[Clause]:
         return self._clauses[index] if 0 <= index < len(self._clauses) else None
 
+    def get_candidates(self, query: Literal) -> List[int]:
+        if self._index is None:
+            self._index = {}
+            for i, clause in enumerate(self._clauses):
+                key = (clause.head.negated, clause.head.functor, clause.head.get_arity())
+                self._index.setdefault(key, []).append(i)
+
+        key = (query.negated, query.functor, query.get_arity())
+        candidates = self._index.get(key, [])
+        for position, term in enumerate(query.terms):
+            if len(candidates) <= 1:
+                break
+
+            if is_ground(term):
+                buckets, others = self._get_arguments(key, position)
+                bucket = buckets.get(term, others)
+                if len(bucket) < len(candidates):
+                    candidates = bucket
+
+        return candidates
+
+    def _get_arguments(self, key: Tuple[bool, str, int], position: int) -> Tuple[Dict[Value, List[int]], List[int]]:
+        arguments = self._arguments.get((key, position))
+        if arguments is None:
+            buckets, others = {}, []
+            for i in self._index.get(key, []):
+                term = self._clauses[i].head.terms[position]
+                if is_ground(term):
+                    buckets.setdefault(term, [*others]).append(i)
+                else:
+                    others.append(i)
+                    for bucket in buckets.values():
+                        bucket.append(i)
+            arguments = self._arguments[(key, position)] = buckets, others
+
+        return arguments
+
     def get_facts(self) -> Iterable[Clause]:
         return [c for c in self._clauses if c.is_fact()]
 
@@ -326,12 +464,20 @@ class Program:
         if not query.is_ground():
             raise ValueError("'query' must be ground: %s" % query)
 
-        from foil.unification import resolve
+        if self._resolver is None:
+            from foil.unification import Resolver
+
+            self._resolver = Resolver(self)
 
-        return resolve(self, query)
+        return self._resolver.resolve(query)
 
-    def ground(self) -> List[Literal]:
-        from foil.rete import ground
+    def ground(self, backend: str = 'rete') -> List[Literal]:
+        if backend == 'rete':
+            from foil.rete import ground
+        elif backend == 'datalog':
+            from foil.datalog import ground
+        else:
+            raise ValueError("'backend' must be either 'rete' or 'datalog': %s" % backend)
 
         return ground(self)
 
@@ -450,8 +596,8 @@ class Problem:
     def resolve(self, query: Literal) -> Optional[Derivation]:
         return self._program.resolve(query)
 
-    def ground(self) -> List[Literal]:
-        return self._program.ground()
+    def ground(self, backend: str = 'rete') -> List[Literal]:
+        return self._program.ground(backend)
 
     def learn(self) -> List[Clause]:
         from foil.old.learning import learn_hypotheses
@@ -1,158 +1,677 @@
+import time
+from collections import namedtuple
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable
+from typing import Dict
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
+from foil.datalog import stratify
 from foil.models import Clause
 from foil.models import Literal
 from foil.models import Program
+from foil.unification import is_variable
 from foil.unification import Substitution
+from foil.unification import Variable
+from foil.utils import Tabling
 
-Payload = Tuple[List[Literal], Substitution]
+Ground = Tuple[Literal, ...]
+Payload = Tuple[Ground, Substitution]
+Index = Dict[Tuple, Dict[Ground, Substitution]]
+Delta = namedtuple('Delta', ['added', 'removed'])
+Statistics = namedtuple('Statistics', ['kind', 'name', 'memory', 'activations', 'comparisons', 'time'])
 
 
 class Root:
 
     def __init__(self):
+        self.memory = {}
+        self.support = {}
+        self.deleted = []
         self.children = set()
+        self.counts = {}
 
     def notify(self, fact: Literal):
-        for child in self.children:
-            child.notify(fact, {}, self)
+        if fact not in self.memory:
+            self.memory[fact] = None
+            key = fact.negated, fact.functor, fact.get_arity()
+            self.counts[key] = self.counts.get(key, 0) + 1
+            for child in self.children:
+                child.notify(fact, {}, self)
 
+    def retract(self, fact: Literal):
+        if fact in self.memory:
+            del self.memory[fact]
+            self.counts[fact.negated, fact.functor, fact.get_arity()] -= 1
+            self.deleted.append(fact)
+            for child in self.children:
+                child.retract(fact, {}, self)
 
-class Alpha:
+
+class Memory:
+
+    def __init__(self):
+        self.memory = {}
+        self.indexes = {}
+        self.activations = 0
+        self.comparisons = 0
+        self.elapsed = 0.0
+        self.timing = False
+
+    def index(self, keys: Tuple[Variable, ...]) -> Index:
+        index = self.indexes.get(keys)
+        if index is None:
+            index = self.indexes[keys] = {}
+            for ground, subst in self.memory.items():
+                index.setdefault(tuple(subst.get(k) for k in keys), {})[ground] = subst
+
+        return index
+
+    def _store(self, ground: Ground, subst: Substitution) -> bool:
+        if ground in self.memory:
+            return False
+
+        self.memory[ground] = subst
+        for keys, index in self.indexes.items():
+            index.setdefault(tuple(subst.get(k) for k in keys), {})[ground] = subst
+
+        return True
+
+    def _discard(self, ground: Ground) -> Optional[Substitution]:
+        subst = self.memory.pop(ground, None)
+        if subst is not None:
+            for keys, index in self.indexes.items():
+                key = tuple(subst.get(k) for k in keys)
+                del index[key][ground]
+                if not index[key]:
+                    del index[key]
+
+        return subst
+
+    def _truncate(self, size: int):
+        while len(self.memory) > size:
+            self._discard(next(reversed(self.memory)))
+
+
+class Alpha(Memory):
 
     def __init__(self, pattern: 'Literal', parent: Root):
+        super().__init__()
         self.parent = parent
+        self.parents = [parent]
         self.pattern = pattern
         self.name = repr(pattern)
-        self.memory = []
+        self.size = 1
+        self.variables = {t for t in pattern.terms if is_variable(t)}
         self.children = set()
         parent.children.add(self)
 
     def notify(self, fact: Literal, subst: Substitution, parent: Root):
+        self.activations += 1
+        start = time.perf_counter() if self.timing else None
         subst = self.pattern.unify(fact)
         if subst is not None:
-            payload = ([fact], subst)
-            if payload not in self.memory:
-                self.memory.append(payload)
+            ground = (fact,)
+            if self._store(ground, subst):
                 for child in self.children:
-                    child.notify([fact], subst, self)
+                    child.notify(ground, subst, self)
+        if start is not None:
+            self.elapsed += time.perf_counter() - start
 
+    def retract(self, fact: Literal, subst: Substitution, parent: Root):
+        ground = (fact,)
+        subst = self._discard(ground)
+        if subst is not None:
+            for child in self.children:
+                child.retract(ground, subst, self)
 
-Node = Union[Alpha, 'Beta']
 
+class Unit(Memory):
 
-class Beta:
+    def __init__(self):
+        super().__init__()
+        self.parents = []
+        self.name = '()'
+        self.size = 0
+        self.variables = set()
+        self.children = set()
+        self._store((), {})
+
+
+Node = Union[Alpha, 'Beta', Unit]
 
-    def __init__(self, parent_1: Node, parent_2: Alpha):
+
+class Beta(Memory):
+
+    def __init__(self, parent_1: Node, parent_2: Alpha, renaming: Substitution = None):
+        super().__init__()
         self.parent_1 = parent_1
         self.parent_2 = parent_2
-        self.name = '%s, %s' % (parent_1.name, parent_2.name)
-        self.memory = []
+        self.parents = [parent_1, parent_2]
+        self.renaming = renaming or {v: v for v in parent_2.variables}
+        self.name = '%s, %s' % (parent_1.name, parent_2.pattern.substitute(self.renaming))
+        self.size = parent_1.size + parent_2.size
+        self.variables = parent_1.variables | {self.renaming[v] for v in parent_2.variables}
+        self.keys = tuple(sorted(parent_1.variables & {self.renaming[v] for v in parent_2.variables}))
+        inverse = {v: k for k, v in self.renaming.items()}
+        self.index_1 = parent_1.index(self.keys)
+        self.index_2 = parent_2.index(tuple(inverse[k] for k in self.keys))
+        self.lefts = {}
+        self.rights = {}
         self.children = set()
         parent_1.children.add(self)
         parent_2.children.add(self)
 
-    def notify(self, fact: List[Literal], subst: Substitution, parent: Node):
+    def notify(self, fact: Ground, subst: Substitution, parent: Node):
+        self.activations += 1
+        start = time.perf_counter() if self.timing else None
         if parent is self.parent_1:
-            for ground_2, subs_2 in self.parent_2.memory:
-                self._notify(fact, subst, ground_2, subs_2)
-        elif parent is self.parent_2:
-            for ground_1, subs_1 in self.parent_1.memory:
+            key = tuple(subst.get(k) for k in self.keys)
+            matches = list(self.index_2.get(key, {}).items())
+            self.comparisons += len(matches)
+            for ground_2, subs_2 in matches:
+                self._notify(fact, subst, ground_2, self._rename(subs_2))
+        if parent is self.parent_2:
+            subst = self._rename(subst)
+            key = tuple(subst.get(k) for k in self.keys)
+            matches = list(self.index_1.get(key, {}).items())
+            self.comparisons += len(matches)
+            for ground_1, subs_1 in matches:
                 self._notify(ground_1, subs_1, fact, subst)
+        if start is not None:
+            self.elapsed += time.perf_counter() - start
 
-    @staticmethod
-    def _unify(subst_1: Substitution, subst_2: Substitution) -> Optional[Substitution]:
-        for var in set(subst_1).intersection(subst_2):
-            if subst_1[var] != subst_2[var]:
-                return None
-
-        return {**subst_1, **subst_2}
-
-    def _notify(self, fact_1: List[Literal], subst_1: Substitution, fact_2: List['Literal'], subst_2: Substitution):
-        subs = self._unify(subst_1, subst_2)
-        if subs is not None:
-            ground = [*fact_1, *fact_2]
-            payload = (ground, subs)
-            if payload not in self.memory:
-                self.memory.append(payload)
+    def retract(self, fact: Ground, subst: Substitution, parent: Node):
+        grounds = set()
+        if parent is self.parent_1:
+            grounds.update(self.lefts.get(fact, ()))
+        if parent is self.parent_2:
+            grounds.update(self.rights.get(fact, ()))
+        self._retract(grounds)
+
+    def _notify(self, fact_1: Ground, subst_1: Substitution, fact_2: Ground, subst_2: Substitution):
+        ground, subs = (*fact_1, *fact_2), {**subst_1, **subst_2}
+        if self._store(ground, subs):
+            for child in self.children:
+                child.notify(ground, subs, self)
+
+    def _retract(self, grounds: Iterable[Ground]):
+        for ground in grounds:
+            subs = self._discard(ground)
+            if subs is not None:
                 for child in self.children:
-                    child.notify(ground, subs, self)
+                    child.retract(ground, subs, self)
+
+    def _rename(self, subst: Substitution) -> Substitution:
+        return {self.renaming.get(k, k): v for k, v in subst.items()}
 
+    def _store(self, ground: Ground, subst: Substitution) -> bool:
+        if not super()._store(ground, subst):
+            return False
 
-class Leaf:
+        split = self.parent_1.size
+        self.lefts.setdefault(ground[:split], set()).add(ground)
+        self.rights.setdefault(ground[split:], set()).add(ground)
 
-    def __init__(self, clause: Clause, parent: Node, root: Root, agenda: List[Clause]):
+        return True
+
+    def _discard(self, ground: Ground) -> Optional[Substitution]:
+        subst = super()._discard(ground)
+        if subst is not None:
+            split = self.parent_1.size
+            for links, key in [(self.lefts, ground[:split]), (self.rights, ground[split:])]:
+                links[key].discard(ground)
+                if not links[key]:
+                    del links[key]
+
+        return subst
+
+
+class Negation(Beta):
+
+    def __init__(self, parent_1: Node, parent_2: Alpha, renaming: Substitution = None):
+        super().__init__(parent_1, parent_2, renaming)
+        self.literal = parent_2.pattern.substitute(self.renaming).get_complement()
+        self.name = '%s, %s' % (parent_1.name, self.literal)
+        self.variables = parent_1.variables
+
+    def notify(self, fact: Ground, subst: Substitution, parent: Node):
+        self.activations += 1
+        start = time.perf_counter() if self.timing else None
+        if parent is self.parent_1:
+            self.comparisons += 1
+            if not self.index_2.get(tuple(subst.get(k) for k in self.keys)):
+                self._accept(fact, subst)
+        if parent is self.parent_2:
+            key = tuple(self._rename(subst).get(k) for k in self.keys)
+            grounds = [g for ground_1 in self.index_1.get(key, {}) for g in self.lefts.get(ground_1, ())]
+            self.comparisons += len(grounds)
+            self._retract(grounds)
+        if start is not None:
+            self.elapsed += time.perf_counter() - start
+
+    def retract(self, fact: Ground, subst: Substitution, parent: Node):
+        if parent is self.parent_1:
+            self._retract(list(self.lefts.get(fact, ())))
+        if parent is self.parent_2:
+            key = tuple(self._rename(subst).get(k) for k in self.keys)
+            if not self.index_2.get(key):
+                for ground_1, subst_1 in list(self.index_1.get(key, {}).items()):
+                    self._accept(ground_1, subst_1)
+
+    def _accept(self, fact: Ground, subst: Substitution):
+        ground = (*fact, self.literal.substitute(subst))
+        if self._store(ground, subst):
+            for child in self.children:
+                child.notify(ground, subst, self)
+
+
+class Leaf(Memory):
+
+    def __init__(self, clause: Clause, parent: Node, root: Root, renaming: Substitution = None):
+        super().__init__()
         self.parent = parent
+        self.parents = [parent]
         self.clause = clause
         self.name = repr(clause)
-        self.memory = []
+        self.head = clause.head.substitute(renaming or {})
 
         self.root = root
-        self.agenda = agenda
         parent.children.add(self)
 
-    def notify(self, fact: List[Literal], subst: Substitution, parent: Node):
-        payload = (fact, subst)
-        if payload not in self.memory:
-            self.memory.append(payload)
+    @property
+    def clauses(self) -> Iterable[Clause]:
+        return [Clause(self.head.substitute(s), list(g)) for g, s in self.memory.items()]
 
-            literal = self.clause.head.substitute(subst)
-            clause = Clause(literal, fact)
-            if clause not in self.agenda:
-                self.agenda.append(clause)
+    def notify(self, fact: Ground, subst: Substitution, parent: Node):
+        self.activations += 1
+        start = time.perf_counter() if self.timing else None
+        ground = tuple(fact)
+        if self._store(ground, subst):
+            literal = self.head.substitute(subst)
+            self.root.support[literal] = self.root.support.get(literal, 0) + 1
 
             self.root.notify(literal)
+        if start is not None:
+            self.elapsed += time.perf_counter() - start
+
+    def retract(self, fact: Ground, subst: Substitution, parent: Node):
+        ground = tuple(fact)
+        if ground in self.memory:
+            literal = self.head.substitute(self.memory[ground])
+            self._discard(ground)
+
+            self.root.retract(literal)
+
+    def _discard(self, ground: Ground) -> Optional[Substitution]:
+        subst = super()._discard(ground)
+        if subst is not None:
+            literal = self.head.substitute(subst)
+            self.root.support[literal] -= 1
+            if not self.root.support[literal]:
+                del self.root.support[literal]
+
+        return subst
 
 
 class Engine:
 
-    def __init__(self):
+    def __init__(self, budget: int = 1 << 20, retain: int = 16):
         self._nodes = {}
-        self._agenda = []
+        self._leaves = {}
+        self._facts = {}
+        self._base = set()
         self._root = Root()
+        self._budget = budget
+        self._cache = OrderedDict()
+        self._size = 0
+        self._key = None
+        self._timing = False
+        self._retain = retain
+        self._prefixes = OrderedDict()
 
     @property
     def clauses(self) -> Iterable[Clause]:
-        return self._agenda
+        return [*self._facts, *(c for leaf in self._leaves.values() for c in leaf.clauses)]
 
     @property
     def facts(self) -> Iterable[Literal]:
-        return list({c.head for c in self._agenda})
+        return list({*(c.head for c in self._facts), *self._root.support})
+
+    def statistics(self) -> List[Statistics]:
+        result = []
+        for node in [*self._nodes.values(), *self._leaves.values()]:
+            kind = type(node).__name__.lower()
+            result.append(Statistics(
+                kind, node.name, len(node.memory), node.activations, node.comparisons, node.elapsed,
+            ))
+
+        return result
+
+    def profile(self, timing: bool = True):
+        self._timing = timing
+        for node in [*self._nodes.values(), *self._leaves.values()]:
+            node.timing = timing
+
+    def reset(self):
+        for node in [*self._nodes.values(), *self._leaves.values()]:
+            node.activations, node.comparisons, node.elapsed = 0, 0, 0.0
+
+    def to_dot(self) -> str:
+        ids = {self._root: 'root'}
+        for i, node in enumerate([*self._nodes.values(), *self._leaves.values()]):
+            ids[node] = 'n%d' % i
+
+        lines = ['digraph rete {', '    root [label="root\\n%d facts", shape=box];' % len(self._root.memory)]
+        for node, name in ids.items():
+            if node is self._root:
+                continue
+
+            shape = {Alpha: 'ellipse', Beta: 'diamond', Negation: 'invtriangle', Unit: 'point'}.get(type(node), 'box')
+            label = '%s\\n%d items' % (node.name.replace('"', '\\"'), len(node.memory))
+            lines.append('    %s [label="%s", shape=%s];' % (name, label, shape))
+            for parent in node.parents:
+                lines.append('    %s -> %s;' % (ids[parent], name))
+        lines.append('}')
+
+        return '\n'.join(lines)
 
     def load(self, clause: Clause):
+        self._load(clause, plan(clause.body, self._estimate))
+
+    def unload(self, clause: Clause):
+        self._key = None
         if clause.is_fact():
-            if clause not in self._agenda:
-                self._agenda.append(clause)
-        else:
-            beta = None
-            for literal in clause.body:
-                name = repr(literal)
-                alpha = self._nodes.setdefault(name, Alpha(literal, self._root))
-                if beta is None:
-                    beta = alpha
-                else:
-                    name = '%s, %s' % (beta.name, alpha.name)
-                    beta = self._nodes.setdefault(name, Beta(beta, alpha))
-            Leaf(clause, beta, self._root, self._agenda)
+            self.retract(clause)
+        elif clause in self._leaves:
+            leaf = self._leaves.pop(clause)
+            self._detach(leaf)
+            for ground, subst in list(leaf.memory.items()):
+                leaf.retract(ground, subst, leaf.parent)
+            self._rederive()
 
     def insert(self, fact: Clause):
         if not fact.is_fact() or not fact.is_ground():
             raise ValueError('Not a ground fact: %s' % fact)
 
+        self._key = None
+        self._base.add(fact.head)
         self._root.notify(fact.head)
+        self._rederive()
 
+    def retract(self, fact: Clause):
+        if not fact.is_fact() or not fact.is_ground():
+            raise ValueError('Not a ground fact: %s' % fact)
 
-# @Tabling
-def ground(program: Program) -> List[Literal]:
+        self._key = None
+        self._facts.pop(fact, None)
+        self._base.discard(fact.head)
+        self._root.retract(fact.head)
+        self._rederive()
+
+    def derive(self, clause: Clause) -> Delta:
+        key = self._get_key(), clause.normalize()
+        delta = self._cache.get(key)
+        if delta is not None:
+            self._cache.move_to_end(key)
+            return delta
+
+        dependents = self._get_dependents(clause.head)
+        body = self._share(clause, dependents) or plan(clause.body, self._estimate)
+        try:
+            delta = self._derive(clause, body, dependents)
+        finally:
+            self._key = key[0]
+
+        self._remember(key, delta)
+
+        return delta
+
+    def _derive(self, clause: Clause, body: List[Literal], dependents: Set[Tuple[str, int]]) -> Delta:
+        negations = [l for c in self._leaves for l in c.body if l.negated]
+        if clause not in self._leaves and any((l.functor, l.get_arity()) in dependents for l in negations):
+            return self._compare(clause, body)
+
+        state = self._save()
+        try:
+            self._load(clause, body)
+            return Delta(self._get_added(state), ())
+        finally:
+            self._restore(state)
+
+    def _compare(self, clause: Clause, body: List[Literal]) -> Delta:
+        before = self.facts
+        try:
+            self._load(clause, body)
+            after = self.facts
+        finally:
+            self.unload(clause)
+        facts, others = set(before), set(after)
+
+        return Delta(tuple(f for f in after if f not in facts), tuple(f for f in before if f not in others))
+
+    def _get_added(self, state: Tuple) -> Tuple[Literal, ...]:
+        _, _, n_facts, n_memory, _ = state
+        added = dict.fromkeys(islice(reversed(self._root.memory), len(self._root.memory) - n_memory))
+        for fact in islice(reversed(self._facts), len(self._facts) - n_facts):
+            if fact.head not in self._root.support:
+                added[fact.head] = None
+
+        return tuple(reversed(added))
+
+    def _remember(self, key: Tuple, delta: Delta):
+        size = len(delta.added) + len(delta.removed)
+        if size <= self._budget:
+            self._cache[key] = delta
+            self._size += size
+            while self._size > self._budget:
+                _, evicted = self._cache.popitem(last=False)
+                self._size -= len(evicted.added) + len(evicted.removed)
+
+    def _share(self, clause: Clause, dependents: Set[Tuple[str, int]]) -> Optional[List[Literal]]:
+        prefix = clause.body[:-1]
+        if not prefix or not is_shareable(prefix, dependents):
+            return None
+
+        body = [*plan(prefix, self._estimate), *clause.body[-1:]]
+        self._keep(self._compile([l.substitute(rename(body)) for l in body[:-1]]))
+
+        return body
+
+    def _get_key(self) -> Tuple:
+        if self._key is None:
+            rules = frozenset(c.normalize() for c in self._leaves)
+            self._key = rules, frozenset(self._facts), frozenset(self._base)
+
+        return self._key
+
+    def _load(self, clause: Clause, body: List[Literal]):
+        self._key = None
+        if clause.is_fact():
+            self._facts[clause] = None
+        elif clause not in self._leaves:
+            if any(l.negated for c in [*self._leaves, clause] for l in c.body):
+                stratify([*self._leaves, clause])
+
+            names = rename([*body, clause.head])
+            beta = self._compile([l.substitute(names) for l in body])
+            leaf = self._leaves[clause] = Leaf(clause, beta, self._root, names)
+            leaf.timing = self._timing
+            for ground_1, subst_1 in list(beta.memory.items()):
+                leaf.notify(ground_1, subst_1, beta)
+            self._rederive()
+
+    def _compile(self, body: List[Literal]) -> Node:
+        beta = None
+        for literal in body:
+            names = rename([literal])
+            alpha = self._get_alpha(literal.get_positive().substitute(names))
+            if beta is None and literal.negated:
+                beta = self._get_unit()
+            if beta is None:
+                beta = alpha
+            else:
+                beta = self._get_beta(beta, alpha, literal, names)
+
+        return beta
+
+    def _get_alpha(self, pattern: Literal) -> Alpha:
+        alpha = self._nodes.get(repr(pattern))
+        if alpha is None:
+            alpha = self._nodes[repr(pattern)] = Alpha(pattern, self._root)
+            alpha.timing = self._timing
+            for fact in self._root.memory:
+                alpha.notify(fact, {}, self._root)
+
+        return alpha
+
+    def _get_unit(self) -> Unit:
+        unit = self._nodes.get('()')
+        if unit is None:
+            unit = self._nodes['()'] = Unit()
+
+        return unit
+
+    def _get_beta(self, parent: Node, alpha: Alpha, literal: Literal, names: Substitution) -> 'Beta':
+        name = '%s, %s' % (parent.name, literal)
+        beta = self._nodes.get(name)
+        if beta is None:
+            kind = Negation if literal.negated else Beta
+            beta = self._nodes[name] = kind(parent, alpha, {v: k for k, v in names.items()})
+            beta.timing = self._timing
+            for ground_1, subst_1 in list(parent.memory.items()):
+                beta.notify(ground_1, subst_1, parent)
+
+        return beta
+
+    def _keep(self, node: Node):
+        self._prefixes[node.name] = node
+        self._prefixes.move_to_end(node.name)
+        while len(self._prefixes) > self._retain:
+            _, node = self._prefixes.popitem(last=False)
+            if not node.children and self._nodes.get(node.name) is node:
+                del self._nodes[node.name]
+                self._detach(node)
+
+    def _get_dependents(self, head: Literal) -> Set[Tuple[str, int]]:
+        dependents, size = {(head.functor, head.get_arity())}, 0
+        while size < len(dependents):
+            size = len(dependents)
+            for clause in self._leaves:
+                if any((l.functor, l.get_arity()) in dependents for l in clause.body):
+                    dependents.add((clause.head.functor, clause.head.get_arity()))
+
+        return dependents
+
+    def _estimate(self, literal: Literal) -> float:
+        if literal.negated:
+            return 0.0
+
+        alpha = self._nodes.get(repr(literal.substitute(rename([literal]))))
+        if alpha is not None:
+            return len(alpha.memory)
+
+        count = self._root.counts.get((literal.negated, literal.functor, literal.get_arity()), 0)
+        variables = [t for t in literal.terms if is_variable(t)]
+        bound = literal.get_arity() - len(set(variables))
+
+        return count * 0.1 ** bound
+
+    def _detach(self, node: Union[Node, Leaf]):
+        for parent in node.parents:
+            parent.children.discard(node)
+            if parent is not self._root and not parent.children and self._nodes.get(parent.name) is parent:
+                del self._nodes[parent.name]
+                self._detach(parent)
+
+    def _rederive(self):
+        deleted, self._root.deleted = self._root.deleted, []
+        for fact in deleted:
+            if fact in self._base or fact in self._root.support:
+                self._root.notify(fact)
+
+    def _save(self) -> Tuple:
+        memories = {n: len(n.memory) for n in [*self._nodes.values(), *self._leaves.values()]}
+
+        return len(self._nodes), len(self._leaves), len(self._facts), len(self._root.memory), memories
+
+    def _restore(self, state: Tuple):
+        n_nodes, n_leaves, n_facts, n_memory, memories = state
+        for clause in list(self._leaves)[n_leaves:]:
+            leaf = self._leaves.pop(clause)
+            leaf.parent.children.discard(leaf)
+            leaf._truncate(0)
+        for name in list(self._nodes)[n_nodes:]:
+            node = self._nodes.pop(name)
+            for parent in node.parents:
+                parent.children.discard(node)
+        for node, size in memories.items():
+            node._truncate(size)
+        while len(self._facts) > n_facts:
+            self._facts.popitem()
+        while len(self._root.memory) > n_memory:
+            fact, _ = self._root.memory.popitem()
+            self._root.counts[fact.negated, fact.functor, fact.get_arity()] -= 1
+
+
+def build(program: Program) -> Engine:
     engine = Engine()
-    for clause in program.clauses:
-        engine.load(clause)
-
     for fact in program.get_facts():
+        engine.load(fact)
         engine.insert(fact)
 
-    return list(engine.facts)
+    for clause in program.get_rules():
+        engine.load(clause)
+
+    return engine
+
+
+def plan(body: Iterable[Literal], estimate: Callable[[Literal], float]) -> List[Literal]:
+    pending, bound, result = list(body), set(), []
+    while pending:
+        literal = min(get_ready(pending, bound), key=estimate)
+        pending.remove(literal)
+        bound.update(get_variables(literal))
+        result.append(literal)
+
+    return result
+
+
+def is_shareable(prefix: List[Literal], dependents: Set[Tuple[str, int]]) -> bool:
+    if any((l.functor, l.get_arity()) in dependents for l in prefix):
+        return False
+
+    bound = set().union(*(get_variables(l) for l in prefix if not l.negated))
+
+    return all(get_variables(l) <= bound for l in prefix if l.negated)
+
+
+def get_ready(pending: List[Literal], bound: Set[Variable]) -> List[Literal]:
+    ready = [l for l in pending if not l.negated or get_variables(l) <= bound]
+    joined = [l for l in ready if bound & get_variables(l)]
+
+    return joined or ready or pending
+
+
+def get_variables(literal: Literal) -> Set[Variable]:
+    return {t for t in literal.terms if is_variable(t)}
+
+
+def rename(literals: Iterable[Literal]) -> Substitution:
+    names = {}
+    for literal in literals:
+        for term in literal.terms:
+            if is_variable(term) and term not in names:
+                names[term] = 'V%d' % len(names)
+
+    return names
+
+
+@Tabling
+def ground(program: Program) -> List[Literal]:
+    return list(build(program).facts)
@@ -0,0 +1,38 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict
+from typing import Iterator
+
+
+class Tracer:
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timings = Counter()
+
+    def __repr__(self) -> str:
+        counters = ', '.join('%s=%d' % (k, v) for k, v in sorted(self.counters.items()))
+        timings = ', '.join('%s=%.6fs' % (k, v) for k, v in sorted(self.timings.items()))
+
+        return '<Tracer>[%s][%s]' % (counters, timings)
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def on_literal(self, candidate: 'Candidate'):
+        pass
+
+    def on_clause(self, hypothesis: 'Hypothesis'):
+        pass
+
+    def report(self) -> Dict[str, float]:
+        return {**self.counters, **{'time.%s' % k: v for k, v in self.timings.items()}}
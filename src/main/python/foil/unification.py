@@ -1,10 +1,15 @@
+import copy
 import re
 from collections import namedtuple
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
+from foil.utils import tabling
+
 Value = Union[bool, float, int, str]
 Variable = str
 Term = Union[Value, Variable]
@@ -14,12 +19,59 @@ Step = namedtuple('Step', ['index', 'literal', 'substitution'])
 Derivation = List[Step]
 
 
+class SymbolTable:
+
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._symbols = []
+        self._values = []
+        self._variables = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def intern(self, term: Term) -> int:
+        key = (type(term), term)
+        symbol = self._ids.get(key)
+        if symbol is None:
+            name = normalize(term)
+            symbol = self._names.get(name)
+            if symbol is None:
+                symbol = self._names[name] = len(self._symbols)
+                self._symbols.append(name)
+                self._values.append(term)
+            self._ids[key] = symbol
+
+        return symbol
+
+    def lookup(self, symbol: int) -> str:
+        return self._symbols[symbol]
+
+    def value(self, symbol: int) -> Term:
+        return self._values[symbol]
+
+    def is_variable(self, term: str) -> bool:
+        result = self._variables.get(term)
+        if result is None:
+            result = self._variables[term] = bool(re.match(r'[_A-Z][_a-zA-Z0-9]*', term))
+
+        return result
+
+
+symbols = SymbolTable()
+
+
+def intern(term: Term) -> int:
+    return symbols.intern(term)
+
+
 def is_ground(term: Term) -> bool:
     return term is not None and not is_variable(term)
 
 
 def is_variable(term: Term) -> bool:
-    return isinstance(term, str) and bool(re.match(r'[_A-Z][_a-zA-Z0-9]*', term))
+    return isinstance(term, str) and symbols.is_variable(term)
 
 
 def normalize(term: Term) -> str:
@@ -94,25 +146,140 @@ def simplify(subst: Substitution) -> Optional[Substitution]:
     return result
 
 
-# @Tabling
-def resolve(program: 'Program', query: 'Literal') -> Optional[Derivation]:
-    for i, clause in enumerate(program.clauses):
-        substitution = clause.head.unify(query)
-        if substitution is None:
+class Resolver:
+
+    def __init__(self, program: 'Program'):
+        self._program = program
+        self._tables = {}
+        self._complete = set()
+        self._positions = {}
+        self._lows = []
+        self._pending = []
+        self._count = 0
+
+    def resolve(self, query: 'Literal') -> Optional[Derivation]:
+        answers, _ = self.solve(query)
+
+        return next(iter(answers.values()), None)
+
+    def solve(self, goal: 'Literal') -> Tuple[Dict['Literal', Derivation], List['Literal']]:
+        if goal.is_ground():
+            candidates = self._program.get_candidates(goal)
+            if all(not self._program.get_clause(i).body for i in candidates):
+                return self._lookup(goal, candidates)
+
+        key = get_variant(goal)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = {}, []
+        if key in self._complete:
+            return table
+
+        if key in self._positions:
+            self._lows[-1] = min(self._lows[-1], self._positions[key])
+            return table
+
+        self._fixpoint(goal, key, table)
+
+        return table
+
+    def _fixpoint(self, goal: 'Literal', key: Tuple, table: Tuple[Dict['Literal', Derivation], List['Literal']]):
+        position = self._positions[key] = len(self._lows)
+        self._lows.append(position)
+        mark = len(self._pending)
+        try:
+            while True:
+                count = self._count
+                self._evaluate(goal, table)
+                if self._lows[-1] < position or count == self._count:
+                    break
+        finally:
+            del self._positions[key]
+            low = self._lows.pop()
+
+        if low < position:
+            self._lows[-1] = min(self._lows[-1], low)
+            self._pending.append(key)
+        else:
+            self._complete.update(self._pending[mark:], [key])
+            del self._pending[mark:]
+
+    def _lookup(self, goal: 'Literal', candidates: List[int]) -> Tuple[Dict['Literal', Derivation], List['Literal']]:
+        for i in candidates:
+            head = self._program.get_clause(i).head
+            substitution = match(head, goal, {})
+            if substitution is not None:
+                return {goal: [Step(i, goal, substitution)]}, [goal]
+
+        return {}, []
+
+    def _evaluate(self, goal: 'Literal', table: Tuple[Dict['Literal', Derivation], List['Literal']]):
+        answers, order = table
+        for i in self._program.get_candidates(goal):
+            clause = self._program.get_clause(i)
+            substitution = match(clause.head, goal, {})
+            if substitution is None:
+                continue
+
+            for subst, derivation in self._prove(clause.body, substitution, []):
+                head = get_answer(clause.head.substitute(subst))
+                if head not in answers and match(goal, head, {}) is not None:
+                    answers[head] = [Step(i, head, subst), *derivation]
+                    order.append(head)
+                    self._count += 1
+
+    def _prove(
+            self,
+            body: List['Literal'],
+            substitution: Substitution,
+            derivation: Derivation,
+    ) -> Iterable[Tuple[Substitution, Derivation]]:
+        if not body:
+            yield substitution, derivation
+            return
+
+        goal = body[0].substitute(substitution)
+        answers, order = self.solve(goal)
+        j = 0
+        while j < len(order):
+            answer, j = order[j], j + 1
+            subst = match(goal, answer, substitution)
+            if subst is not None:
+                yield from self._prove(body[1:], subst, [*derivation, *answers[answer]])
+
+
+def get_variant(literal: 'Literal') -> Tuple:
+    names = {}
+    terms = tuple(names.setdefault(t, len(names)) if is_variable(t) else (intern(t),) for t in literal.terms)
+
+    return literal.negated, literal.functor, terms
+
+
+def get_answer(literal: 'Literal') -> 'Literal':
+    names = {}
+    for term in literal.terms:
+        if is_variable(term) and term not in names:
+            names[term] = 'V%d' % len(names)
+
+    return literal.substitute(names) if names else literal
+
+
+def match(pattern: 'Literal', literal: 'Literal', subst: Substitution) -> Optional[Substitution]:
+    result = subst
+    for term, other in zip(pattern.terms, literal.terms):
+        if is_variable(term):
+            term = result.get(term, term)
+        if is_variable(term):
+            if not is_variable(other):
+                result = {**result, term: other}
+        elif is_variable(other):
             continue
+        elif term != other:
+            return None
 
-        derivation = [Step(i, query, substitution)]
-        if not clause.body:
-            return derivation
-
-        for query in clause.body:
-            substituted = query.substitute(substitution)
-            sub_goal = resolve(program, substituted)
-            if not sub_goal:
-                return None
-
-            derivation = [*derivation, *sub_goal]
+    return result
 
-        return derivation
 
-    return None
+@tabling(clone=copy.deepcopy)
+def resolve(program: 'Program', query: 'Literal') -> Optional[Derivation]:
+    return Resolver(program).resolve(query)
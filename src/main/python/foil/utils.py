@@ -1,26 +1,78 @@
+import copy
+from collections import namedtuple
+from collections import OrderedDict
+from functools import update_wrapper
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+
+Info = namedtuple('Info', ['hits', 'misses', 'maxsize', 'size'])
+
+
 class Tabling:
-    def __init__(self, f):
+
+    def __init__(self, f: Callable, maxsize: Optional[int] = 128, clone: Optional[Callable[[Any], Any]] = copy.copy):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("'maxsize' must be non-negative: %s" % maxsize)
+
         self.f = f
-        self.cache = {}
-
-    def __call__(self, *args):
-        key = ()
-        for arg in args:
-            if type(arg) is list:
-                # values = ()
-                # for item in arg:
-                #     val = ()
-                #     if type(item) is dict:
-                #         val = (*val, tuple((k, v) for k, v in item.items()))
-                #     else:
-                #         val = (*val, item)
-                #     values = (*values, val)
-                # key = (*key, values)
-                key = (*key, tuple(arg))
-            elif type(arg) is dict:
-                key = (*key, tuple((k, v) for k, v in arg.items()))
-            else:
-                key = (*key, arg)
-
-        # return copy.deepcopy(self.cache.setdefault(key, self.f(*args)))
-        return self.cache.setdefault(key, self.f(*args))
+        self.maxsize = maxsize
+        self.clone = clone
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        update_wrapper(self, f)
+
+    def __call__(self, *args, **kwargs):
+        try:
+            key = get_key((args, kwargs))
+        except TypeError:
+            self.misses += 1
+            return self.f(*args, **kwargs)
+
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            result = self.cache[key]
+        else:
+            self.misses += 1
+            result = self.f(*args, **kwargs)
+            if self.maxsize != 0:
+                self.cache[key] = result
+                if self.maxsize is not None and len(self.cache) > self.maxsize:
+                    self.cache.popitem(last=False)
+
+        return result if self.clone is None else self.clone(result)
+
+    def info(self) -> Info:
+        return Info(self.hits, self.misses, self.maxsize, len(self.cache))
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def tabling(maxsize: Optional[int] = 128, clone: Optional[Callable[[Any], Any]] = copy.copy) -> Callable:
+    return lambda f: Tabling(f, maxsize, clone)
+
+
+def get_key(value: Any) -> Hashable:
+    from foil.models import Program
+
+    if isinstance(value, Program):
+        return Program, tuple(value.clauses), tuple(value.declarations)
+
+    if isinstance(value, dict):
+        return dict, frozenset((k, get_key(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(get_key(v) for v in value)
+
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset(get_key(v) for v in value)
+
+    hash(value)
+
+    return type(value), value
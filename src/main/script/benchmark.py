@@ -0,0 +1,182 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from random import Random
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from foil import datalog
+from foil import rete
+from foil.examples.generators import get_family
+from foil.examples.generators import get_graph
+from foil.examples.generators import get_relations
+from foil.learning import extend
+from foil.learning import find_literal
+from foil.learning import foil
+from foil.learning import get_closure
+from foil.learning import get_constants
+from foil.learning import get_masks
+from foil.models import Clause
+from foil.models import Literal
+from foil.models import Program
+
+
+def bench_ground_rete(scale: int) -> Callable:
+    target, background, _ = get_graph(40 * scale, 80 * scale, 0)
+    program = Program([*background, *rules(target)])
+
+    def run():
+        rete.ground.clear()
+        program.ground('rete')
+
+    return run
+
+
+def bench_ground_datalog(scale: int) -> Callable:
+    target, background, _ = get_graph(40 * scale, 80 * scale, 0)
+    program = Program([*background, *rules(target)])
+
+    def run():
+        datalog.ground.clear()
+        program.ground('datalog')
+
+    return run
+
+
+def bench_resolve(scale: int) -> Callable:
+    target, background, examples = get_graph(40 * scale, 80 * scale, 0)
+    queries = [target.substitute(e.assignment) for e in Random(0).sample(examples, min(len(examples), 20 * scale))]
+
+    def run():
+        program = Program([*background, *rules(target)])
+        for query in queries:
+            program.resolve(query)
+
+    return run
+
+
+def bench_get_closure(scale: int) -> Callable:
+    target, background, examples = get_relations(3, 200 * scale, 30 * scale, 0)
+    constants = get_constants([l for c in background for l in c.literals])
+    world = [c.head for c in background]
+
+    return lambda: get_closure(target, constants, world, examples)
+
+
+def bench_extend(scale: int) -> Callable:
+    target, background, examples = get_relations(3, 400 * scale, 40 * scale, 0)
+    constants = get_constants([l for c in background for l in c.literals])
+    world = [c.head for c in background]
+    assignments = [e.assignment for e in examples]
+
+    return lambda: extend(assignments, Literal.parse('r1(Y,V0)'), constants, world)
+
+
+def bench_find_literal(scale: int) -> Callable:
+    target, background, examples = get_graph(15 * scale, 25 * scale, 0)
+    constants = get_constants([l for c in background for l in c.literals])
+    positives, negatives = get_closure(target, constants, [], examples)
+    masks = get_masks([target, *(l for c in background for l in c.literals)])
+
+    return lambda: find_literal([], target, [], background, masks, constants, positives, negatives)
+
+
+def bench_foil(scale: int) -> Callable:
+    target, background, examples = get_family(24 * scale, 3, 0)
+    constants = get_constants([l for c in background for l in c.literals])
+    positives, negatives = get_closure(target, constants, [], examples)
+    masks = get_masks([target, *(l for c in background for l in c.literals)])
+
+    return lambda: foil(target, background, masks, constants, positives, negatives)
+
+
+def rules(target: Literal) -> List[Clause]:
+    return Clause.parse_many([
+        '%s :- edge(X,Y).' % target,
+        '%s :- edge(X,Z), path(Z,Y).' % target,
+    ])
+
+
+BENCHMARKS = {
+    'ground.rete': bench_ground_rete,
+    'ground.datalog': bench_ground_datalog,
+    'resolve': bench_resolve,
+    'get_closure': bench_get_closure,
+    'extend': bench_extend,
+    'find_literal': bench_find_literal,
+    'foil': bench_foil,
+}
+
+
+def measure(names: List[str], scale: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        run = BENCHMARKS[name](scale)
+        timings = timeit.repeat(run, number=1, repeat=repeat)
+        results[name] = {'best': min(timings), 'median': statistics.median(timings)}
+        print('%-16s best %10.6f s   median %10.6f s' % (name, results[name]['best'], results[name]['median']))
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    regressed = False
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['best'] / baseline[name]['best'] if baseline[name]['best'] else float('inf')
+            flag = ratio > 1 + tolerance
+            regressed |= flag
+            print('%-16s %6.2fx%s' % (name, ratio, '   REGRESSION' if flag else ''))
+
+    return regressed
+
+
+def load(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as stream:
+        return json.load(stream)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the PyFOIL benchmark suite.')
+    parser.add_argument('names', nargs='*', metavar='name', help='benchmarks to run (default: all)')
+    parser.add_argument('--scale', type=int, default=1, help='problem size multiplier (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark (default: 5)')
+    parser.add_argument('--output', help='JSON history file to append this run to')
+    parser.add_argument('--compare', help='JSON history file whose last run with the same scale is the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown ratio (default: 0.1)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark: %s (choose from %s)' % (name, ', '.join(BENCHMARKS)))
+
+    results = measure(args.names or list(BENCHMARKS), args.scale, args.repeat)
+
+    regressed = False
+    if args.compare:
+        runs = [r for r in load(args.compare) if r['scale'] == args.scale]
+        if runs:
+            print()
+            regressed = compare(results, runs[-1]['results'], args.tolerance)
+
+    if args.output:
+        history = load(args.output)
+        history.append({
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'scale': args.scale,
+            'repeat': args.repeat,
+            'results': results,
+        })
+        with open(args.output, 'w') as stream:
+            json.dump(history, stream, indent=2)
+
+    sys.exit(1 if regressed else 0)
@@ -32,12 +32,12 @@ if __name__ == '__main__':
         Example({'X': 4, 'Y': 8}), Example({'X': 6, 'Y': 8}), Example({'X': 7, 'Y': 6}),
         Example({'X': 7, 'Y': 8}),
     ]
-    background = [
-        Clause.parse('edge(0,1).'), Clause.parse('edge(0,3).'), Clause.parse('edge(1,2).'),
-        Clause.parse('edge(3,2).'), Clause.parse('edge(3,4).'), Clause.parse('edge(4,5).'),
-        Clause.parse('edge(4,6).'), Clause.parse('edge(6,8).'), Clause.parse('edge(7,6).'),
-        Clause.parse('edge(7,8).'),
-    ]
+    background = Clause.parse_many([
+        'edge(0,1).', 'edge(0,3).', 'edge(1,2).',
+        'edge(3,2).', 'edge(3,4).', 'edge(4,5).',
+        'edge(4,6).', 'edge(6,8).', 'edge(7,6).',
+        'edge(7,8).',
+    ])
 
     for i in range(10):
         with Measure():
@@ -0,0 +1,156 @@
+import pickle
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.coverage import encode
+from foil.coverage import index
+from foil.coverage import lookup
+from foil.coverage import Table
+from foil.models import Literal
+from foil.unification import intern
+
+world = [
+    Literal.parse('edge(0,1)'), Literal.parse('edge(0,3)'), Literal.parse('edge(1,2)'),
+    Literal.parse('edge(3,3)'), Literal.parse('path(0,1)'),
+]
+
+
+class TableTest(TestCase):
+
+    def test__decode(self):
+        for i, entry in enumerate([
+            ([], []),
+            ([{'X': 0, 'Y': 1}], [{'X': 0, 'Y': 1}]),
+            ([{'X': 'a', 'Y': 1.5}, {'X': True, 'Y': '"s"'}], [{'X': 'a', 'Y': 1.5}, {'X': True, 'Y': '"s"'}]),
+        ]):
+            assignments, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Table.encode(assignments).decode()
+
+                assert_that(result, 'Table.decode(self) -> List[Assignment]:') \
+                    .is_equal_to(expected)
+
+    def test__reduce(self):
+        for i, entry in enumerate([
+            [],
+            [{'X': 0, 'Y': 1}],
+            [{'X': 'a', 'Y': 1.5}, {'X': True, 'Y': 'a'}],
+        ]):
+            assignments = entry
+            with self.subTest(i=i, value=entry):
+                result = pickle.loads(pickle.dumps(Table.encode(assignments))).decode()
+
+                assert_that(result, 'Table.__reduce__(self):') \
+                    .is_equal_to(assignments)
+
+    def test__extend(self):
+        for i, entry in enumerate([
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], 'edge(X,Y)', [{'X': 0, 'Y': 1}], [0]),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], 'edge(Y,X)', [], []),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], 'edge(X,V0)',
+             [{'X': 0, 'Y': 1, 'V0': 1}, {'X': 0, 'Y': 1, 'V0': 3}, {'X': 1, 'Y': 1, 'V0': 2}], [0, 0, 1]),
+            ([{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], 'edge(V0,V0)',
+             [{'X': 0, 'Y': 1, 'V0': 3}, {'X': 3, 'Y': 1, 'V0': 3}], [0, 1]),
+            ([{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], 'edge(X,X)', [{'X': 3, 'Y': 1}], [1]),
+            ([{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], 'edge(X,3)', [{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], [0, 1]),
+            ([{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], 'edge(V0,V1)',
+             [{'X': 0, 'Y': 1, 'V0': 0, 'V1': 1}, {'X': 0, 'Y': 1, 'V0': 0, 'V1': 3},
+              {'X': 0, 'Y': 1, 'V0': 1, 'V1': 2}, {'X': 0, 'Y': 1, 'V0': 3, 'V1': 3},
+              {'X': 3, 'Y': 1, 'V0': 0, 'V1': 1}, {'X': 3, 'Y': 1, 'V0': 0, 'V1': 3},
+              {'X': 3, 'Y': 1, 'V0': 1, 'V1': 2}, {'X': 3, 'Y': 1, 'V0': 3, 'V1': 3}], [0, 0, 0, 0, 1, 1, 1, 1]),
+            ([{'X': 0, 'Y': 1}], '~edge(X,Y)', [], []),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 0}], '~edge(X,Y)', [{'X': 1, 'Y': 0}], [1]),
+            ([{'X': 0, 'Y': 1}, {'X': 2, 'Y': 0}], '~edge(X,V0)', [{'X': 2, 'Y': 0}], [1]),
+            ([{'X': 0, 'Y': 1}, {'X': 3, 'Y': 1}], '~edge(X,X)', [{'X': 0, 'Y': 1}], [0]),
+        ]):
+            assignments, literal, expected, origins = entry
+            with self.subTest(i=i, value=entry):
+                literal = Literal.parse(literal)
+                result, result_origins = Table.encode(assignments).extend(literal, encode(world, literal))
+
+                if not expected:
+                    assert_that(result.decode(), 'Table.extend(self, literal: Literal, relation: np.ndarray):') \
+                        .is_empty()
+                else:
+                    assert_that(result.decode(), 'Table.extend(self, literal: Literal, relation: np.ndarray):') \
+                        .contains_only(*expected)
+                assert_that(sorted(result_origins.tolist()), 'Table.extend(self, literal: Literal, relation: np.ndarray):') \
+                    .is_equal_to(origins)
+
+    def test__reach(self):
+        for i, entry in enumerate([
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 2}, {'X': 2, 'Y': 0}], 'red(X)', 0),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 2}, {'X': 2, 'Y': 0}], 'edge(X,Y)', 2),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 2}, {'X': 2, 'Y': 0}], 'path(X,Y)', 1),
+            ([{'X': 0, 'Y': 3}, {'X': 0, 'Y': 1}, {'X': 5, 'Y': 6}], 'edge(X,Y)', 2),
+        ]):
+            assignments, literal, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Table.encode(assignments).reach(encode(world, Literal.parse(literal)))
+
+                assert_that(result, 'Table.reach(self, relation: np.ndarray) -> int:') \
+                    .is_equal_to(expected)
+
+    def test__encode(self):
+        for i, entry in enumerate([
+            ('edge(X,Y)', None, [[0, 1], [0, 3], [1, 2], [3, 3]]),
+            ('edge(X,Y)', [{0}, None], [[0, 1], [0, 3]]),
+            ('edge(X,Y)', [None, {2, 3}], [[0, 3], [1, 2], [3, 3]]),
+            ('edge(X,Y)', [{1}, {3}], []),
+            ('red(X)', [{0}], []),
+        ]):
+            literal, domains, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = encode(world, Literal.parse(literal), domains)
+
+                assert_that(
+                    result.tolist(),
+                    'encode(facts: Iterable[Literal], literal: Literal, domains: Sequence[Optional[Set]] = None)'
+                    ' -> np.ndarray:',
+                ).is_equal_to([[intern(v) for v in row] for row in expected])
+
+    def test__index(self):
+        for i, entry in enumerate([
+            ([], {}),
+            (world, {'edge/2': [[0, 1], [0, 3], [1, 2], [3, 3]], 'path/2': [[0, 1]]}),
+            ([Literal.parse('red(a)'), Literal.parse('~red(b)')], {'red/1': [['a']], '~red/1': [['b']]}),
+        ]):
+            facts, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = {repr(m): r.tolist() for m, r in index(facts).items()}
+
+                assert_that(result, 'index(facts: Iterable[Literal]) -> Dict[Mask, np.ndarray]:') \
+                    .is_equal_to({m: [[intern(v) for v in row] for row in rows] for m, rows in expected.items()})
+
+    def test__lookup(self):
+        for i, entry in enumerate([
+            ('edge(X,Y)', None, [[0, 1], [0, 3], [1, 2], [3, 3]]),
+            ('edge(X,Y)', [{3}, None], [[3, 3]]),
+            ('path(X,Y)', None, [[0, 1]]),
+            ('red(X)', None, []),
+            ('~path(X,Y)', None, [[0, 1]]),
+        ]):
+            literal, domains, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = lookup(index(world), Literal.parse(literal), domains)
+
+                assert_that(
+                    result.tolist(),
+                    'lookup(relations: Dict[Mask, np.ndarray], literal: Literal,'
+                    ' domains: Sequence[Optional[Set]] = None) -> np.ndarray:',
+                ).is_equal_to([[intern(v) for v in row] for row in expected])
+
+    def test__covers(self):
+        for i, entry in enumerate([
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], [], [False, False]),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], [{'X': 1, 'Y': 1}], [False, True]),
+            ([{'X': 0, 'Y': 1}, {'X': 1, 'Y': 1}], [{'Y': 1, 'X': 0}, {'X': 1, 'Y': 1}], [True, True]),
+        ]):
+            examples, examples_i, expected = entry
+            with self.subTest(i=i, value=entry):
+                table = Table.encode(examples)
+                result = table.covers(Table.encode(examples_i, ['X', 'Y']))
+
+                assert_that(result.tolist(), 'Table.covers(self, other: Table) -> np.ndarray:') \
+                    .is_equal_to(expected)
@@ -0,0 +1,117 @@
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.datalog import get_components
+from foil.datalog import ground
+from foil.datalog import Relation
+from foil.datalog import stratify
+from foil.models import Clause
+from foil.models import Literal
+from foil.models import Program
+
+
+class RelationTest(TestCase):
+
+    def test__add(self):
+        for i, entry in enumerate([
+            (Relation(), Literal.parse('edge(0,1)'), True),
+            (Relation([Literal.parse('edge(0,1)')]), Literal.parse('edge(0,1)'), False),
+            (Relation([Literal.parse('edge(0,1)')]), Literal.parse('edge(1,0)'), True),
+        ]):
+            relation, fact, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = relation.add(fact)
+
+                assert_that(result, 'Relation.add(self, fact: Literal) -> bool:') \
+                    .is_equal_to(expected)
+
+    def test__match(self):
+        facts = [Literal.parse('edge(0,1)'), Literal.parse('edge(0,2)'), Literal.parse('edge(2,2)')]
+        for i, entry in enumerate([
+            (Relation(facts), Literal.parse('edge(X,Y)'),
+             [{'X': 0, 'Y': 1}, {'X': 0, 'Y': 2}, {'X': 2, 'Y': 2}]),
+            (Relation(facts), Literal.parse('edge(0,Y)'), [{'Y': 1}, {'Y': 2}]),
+            (Relation(facts), Literal.parse('edge(X,2)'), [{'X': 0}, {'X': 2}]),
+            (Relation(facts), Literal.parse('edge(X,X)'), [{'X': 2}]),
+            (Relation(facts), Literal.parse('edge(1,Y)'), []),
+            (Relation(facts), Literal.parse('edge(0,1)'), [{}]),
+        ]):
+            relation, pattern, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = list(relation.match(pattern))
+
+                assert_that(result, 'Relation.match(self, pattern: Literal) -> Iterable[Substitution]:') \
+                    .is_equal_to(expected)
+
+
+class DatalogTest(TestCase):
+
+    def test__stratify(self):
+        for i, entry in enumerate([
+            ([], []),
+            (['path(X,Y) :- edge(X,Y).', 'path(X,Y) :- edge(X,Z), path(Z,Y).'],
+             [['path(X,Y) :- edge(X,Y).', 'path(X,Y) :- edge(X,Z), path(Z,Y).']]),
+            (['loop(X) :- path(X,X).', 'path(X,Y) :- edge(X,Y).'],
+             [['path(X,Y) :- edge(X,Y).'], ['loop(X) :- path(X,X).']]),
+            (['odd(X) :- even(Y), succ(Y,X).', 'even(X) :- odd(Y), succ(Y,X).', 'num(X) :- even(X).'],
+             [['odd(X) :- even(Y), succ(Y,X).', 'even(X) :- odd(Y), succ(Y,X).'], ['num(X) :- even(X).']]),
+            (['sink(X) :- node(X), ~path(X,Y).', 'path(X,Y) :- edge(X,Y).'],
+             [['path(X,Y) :- edge(X,Y).'], ['sink(X) :- node(X), ~path(X,Y).']]),
+        ]):
+            rules, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = stratify([Clause.parse(r) for r in rules])
+
+                assert_that(result, 'stratify(rules: List[Clause]) -> List[List[Clause]]:') \
+                    .is_equal_to([[Clause.parse(r) for r in s] for s in expected])
+
+    def test__stratify__negation(self):
+        for i, entry in enumerate([
+            ['p(X) :- node(X), ~p(X).'],
+            ['p(X) :- node(X), ~q(X).', 'q(X) :- node(X), ~p(X).'],
+            ['p(X) :- node(X), ~q(X).', 'q(X) :- r(X).', 'r(X) :- p(X).'],
+        ]):
+            rules = entry
+            with self.subTest(i=i, value=entry):
+                assert_that(stratify, 'stratify(rules: List[Clause]) -> List[List[Clause]]:') \
+                    .raises(ValueError).when_called_with([Clause.parse(r) for r in rules])
+
+    def test__get_components(self):
+        for i, entry in enumerate([
+            ({}, []),
+            ({'a': {'b'}, 'b': set()}, [{'b'}, {'a'}]),
+            ({'a': {'b'}, 'b': {'a'}}, [{'a', 'b'}]),
+            ({'a': {'a', 'b'}, 'b': {'c'}, 'c': {'b'}, 'd': {'a'}}, [{'b', 'c'}, {'a'}, {'d'}]),
+        ]):
+            graph, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_components(graph)
+
+                assert_that(result, 'get_components(graph: Dict[Mask, Set[Mask]]) -> List[Set[Mask]]:') \
+                    .is_equal_to(expected)
+
+    def test__ground(self):
+        for i, entry in enumerate([
+            ('', []),
+            ('edge(0,1).', ['edge(0,1)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).',
+             ['edge(0,1)', 'edge(1,2)', 'path(0,1)', 'path(1,2)', 'path(0,2)']),
+            ('edge(0,1). edge(1,0). path(X,Y) :- edge(X,Y). path(X,Y) :- path(X,Z), path(Z,Y). loop(X) :- path(X,X).',
+             ['edge(0,1)', 'edge(1,0)', 'path(0,1)', 'path(1,0)', 'path(0,0)', 'path(1,1)', 'loop(0)', 'loop(1)']),
+            ('node(0). node(1). node(2). edge(0,1). sink(X) :- ~edge(X,Y), node(X).',
+             ['node(0)', 'node(1)', 'node(2)', 'edge(0,1)', 'sink(1)', 'sink(2)']),
+            ('node(0). node(1). edge(0,1). path(X,Y) :- edge(X,Y). far(X,Y) :- node(X), node(Y), ~path(X,Y).',
+             ['node(0)', 'node(1)', 'edge(0,1)', 'path(0,1)', 'far(0,0)', 'far(1,0)', 'far(1,1)']),
+            ('node(0). ~red(0). blue(X) :- node(X), ~red(X).', ['node(0)', '~red(0)', 'blue(0)']),
+            ('edge(0,1). none :- ~edge(X,Y). some :- ~none.', ['edge(0,1)', 'some']),
+        ]):
+            source, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = ground(Program.parse(source))
+
+                if not expected:
+                    assert_that(result, 'ground(program: Program) -> List[Literal]:').is_empty()
+                else:
+                    assert_that(result, 'ground(program: Program) -> List[Literal]:') \
+                        .contains_only(*[Literal.parse(e) for e in expected])
@@ -1,8 +1,10 @@
 import math
+from random import Random
 from unittest import TestCase
 
 from assertpy import assert_that
 
+from foil.learning import bound_gain
 from foil.learning import Candidate
 from foil.learning import covers
 from foil.learning import entropy
@@ -14,17 +16,22 @@ from foil.learning import foil
 from foil.learning import gain
 from foil.learning import get_closure
 from foil.learning import get_constants
+from foil.learning import get_dependents
+from foil.learning import get_domains
 from foil.learning import get_masks
-from foil.learning import get_signature
 from foil.learning import get_table
+from foil.learning import get_typing
+from foil.learning import get_weight
 from foil.learning import Hypothesis
 from foil.learning import itemize
+from foil.learning import iter_negatives
 from foil.learning import max_gain
 from foil.models import Clause
 from foil.models import Example
 from foil.models import Literal
 from foil.models import Mask
 from foil.models import Program
+from foil.tracing import Tracer
 
 hypotheses_0 = []
 hypotheses_1 = [Clause.parse('path(X,Y) :- edge(X,Y).')]
@@ -181,6 +188,83 @@ class LearningTest(TestCase):
                         ' examples: List[Example]) -> Tuple[List[Assignment], List[Assignment]]:',
                     ).contains_only(*expected[1])
 
+    def test__iter_negatives(self):
+        for i, entry in enumerate([
+            (['X'], [], set(), None, 'uniform', [], []),
+            (['X', 'Y'], [0, 1], set(), None, 'uniform', [],
+             [{'X': 0, 'Y': 0}, {'X': 0, 'Y': 1}, {'X': 1, 'Y': 0}, {'X': 1, 'Y': 1}]),
+            (['X', 'Y'], [0, 1], {(0, 1), (1, 1)}, None, 'uniform', [], [{'X': 0, 'Y': 0}, {'X': 1, 'Y': 0}]),
+            (['X', 'Y'], [0, 1], {(0, 1), (1, 1)}, Random(0), 'uniform', [], [{'X': 0, 'Y': 0}, {'X': 1, 'Y': 0}]),
+            ([], [0, 1], set(), Random(0), 'uniform', [], [{}]),
+            (['X', 'Y'], [0, 1, 2], {(0, 1)}, Random(0), 'stratified', [], [
+                {'X': 0, 'Y': 0}, {'X': 0, 'Y': 2}, {'X': 1, 'Y': 0}, {'X': 1, 'Y': 1},
+                {'X': 1, 'Y': 2}, {'X': 2, 'Y': 0}, {'X': 2, 'Y': 1}, {'X': 2, 'Y': 2},
+            ]),
+            (['X', 'Y'], [0, 1, 2], {(0, 1)}, Random(0), 'near-miss', [(0, 1)], [
+                {'X': 0, 'Y': 0}, {'X': 0, 'Y': 2}, {'X': 1, 'Y': 1}, {'X': 2, 'Y': 1},
+            ]),
+        ]):
+            variables, constants, exclude, rng, strategy, positives, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = list(iter_negatives(variables, constants, exclude, rng, strategy, positives))
+
+                if not expected:
+                    assert_that(
+                        result,
+                        'iter_negatives(variables: List[Variable], constants: List[Value],'
+                        ' exclude: Set[Tuple[Value, ...]], rng: Random = None, strategy: str = \'uniform\','
+                        ' positives: List[Tuple[Value, ...]] = None) -> Iterable[Assignment]:',
+                    ).is_empty()
+                else:
+                    assert_that(
+                        result,
+                        'iter_negatives(variables: List[Variable], constants: List[Value],'
+                        ' exclude: Set[Tuple[Value, ...]], rng: Random = None, strategy: str = \'uniform\','
+                        ' positives: List[Tuple[Value, ...]] = None) -> Iterable[Assignment]:',
+                    ).contains_only(*expected).is_length(len(expected))
+
+    def test__get_closure__limit(self):
+        for i, entry in enumerate([
+            (10, None),
+            (10, 0),
+            (100, None),
+        ]):
+            limit, seed = entry
+            with self.subTest(i=i, value=entry):
+                examples = [Example(p) for p in pos_0_0]
+                prefix = [n for n in neg_0_0 if n['X'] == 0] + [n for n in neg_0_0 if n['X'] == 1]
+                result = get_closure(target, constants, [], examples, limit, seed)
+
+                assert_that(
+                    result[1],
+                    'get_closure(target: Literal, constants: List[Value], world: List[Literal],'
+                    ' examples: List[Example], limit: int = None, seed: int = None, strategy: str = \'uniform\')'
+                    ' -> Tuple[List[Assignment], List[Assignment]]:',
+                ).is_length(min(limit, len(neg_0_0))).is_not_equal_to(prefix)
+                assert_that(
+                    neg_0_0,
+                    'get_closure(target: Literal, constants: List[Value], world: List[Literal],'
+                    ' examples: List[Example], limit: int = None, seed: int = None, strategy: str = \'uniform\')'
+                    ' -> Tuple[List[Assignment], List[Assignment]]:',
+                ).contains(*result[1])
+
+    def test__get_weight(self):
+        for i, entry in enumerate([
+            (pos_0_0, [], 1.0),
+            (pos_0_0, neg_0_0, 1.0),
+            (pos_0_0, neg_0_0[:31], 2.0),
+            ([], [{'X': 0, 'Y': 0}], 81.0),
+        ]):
+            positives, negatives, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_weight(target, constants, positives, negatives)
+
+                assert_that(
+                    result,
+                    'get_weight(target: Literal, constants: List[Value], positives: List[Assignment],'
+                    ' negatives: List[Assignment]) -> float:',
+                ).is_equal_to(expected)
+
     def test__get_masks(self):
         for i, entry in enumerate([
             ([target, *[l for c in background for l in c.literals]], [Mask(False, 'path', 2), Mask(False, 'edge', 2)]),
@@ -191,9 +275,57 @@ class LearningTest(TestCase):
 
                 assert_that(
                     result,
-                    'get_masks(literals: List[Literal]) -> List[Mask]:',
+                    'get_masks(literals: List[Literal], declarations: List[Mask] = None) -> List[Mask]:',
                 ).contains_only(*expected)
 
+    def test__get_masks__declarations(self):
+        for i, entry in enumerate([
+            ([target, edge_x_y], [], [(None, None), (None, None)]),
+            ([target, edge_x_y], [Mask.parse('edge(+node,-node)')], [(None, None), ('+', '-')]),
+            ([target, edge_x_y], [Mask.parse('~edge(+node,-node)')], [(None, None), (None, None)]),
+        ]):
+            literals, declarations, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = [m.modes or (None,) * m.arity for m in get_masks(literals, declarations)]
+
+                assert_that(
+                    result,
+                    'get_masks(literals: List[Literal], declarations: List[Mask] = None) -> List[Mask]:',
+                ).is_equal_to(expected)
+
+    def test__get_typing(self):
+        for i, entry in enumerate([
+            ([target, edge_x_v0], [Mask(False, 'edge', 2)], {}),
+            ([target, edge_x_v0], [Mask.parse('edge(node,color)')], {'X': 'node', 'V0': 'color'}),
+            ([target, edge_x_v0], [Mask.parse('path(node,node)'), Mask.parse('edge(node,color)')],
+             {'X': 'node', 'Y': 'node', 'V0': 'color'}),
+            ([Literal.parse('edge(0,X)')], [Mask.parse('edge(node,-)')], {}),
+        ]):
+            literals, masks, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_typing(literals, masks)
+
+                assert_that(result, 'get_typing(literals: List[Literal], masks: List[Mask]) -> Dict[Variable, str]:') \
+                    .is_equal_to(expected)
+
+    def test__get_domains(self):
+        world = [Literal.parse('node(0)'), Literal.parse('node(1)'), Literal.parse('color(red)')]
+        for i, entry in enumerate([
+            ([Mask(False, 'edge', 2)], {}),
+            ([Mask.parse('edge(node,node)')], {Mask(False, 'edge', 2): [{0, 1}, {0, 1}]}),
+            ([Mask.parse('edge(node,color)')], {Mask(False, 'edge', 2): [{0, 1}, {'red'}]}),
+            ([Mask.parse('edge(node,weight)')], {Mask(False, 'edge', 2): [{0, 1}, None]}),
+            ([Mask.parse('edge(weight,-)')], {}),
+        ]):
+            masks, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_domains(world, masks)
+
+                assert_that(
+                    result,
+                    'get_domains(world: List[Literal], masks: List[Mask]) -> Dict[Mask, List[Optional[Set[Value]]]]:',
+                ).is_equal_to(expected)
+
     def test__get_constants(self):
         for i, entry in enumerate([
             ([target, *[l for c in background for l in c.literals]], [0, 1, 2, 3, 4, 5, 6, 7, 8]),
@@ -209,14 +341,18 @@ class LearningTest(TestCase):
 
     def test__foil(self):
         for i, entry in enumerate([
-            (pos_0_0, neg_0_0, [
+            (pos_0_0, neg_0_0, 0, [
+                Clause.parse('path(X,Y) :- edge(X,Y).'),
+                Clause.parse('path(X,Y) :- edge(X,V0), path(V0,Y).'),
+            ]),
+            (pos_0_0, neg_0_0, 2, [
                 Clause.parse('path(X,Y) :- edge(X,Y).'),
                 Clause.parse('path(X,Y) :- edge(X,V0), path(V0,Y).'),
             ]),
         ]):
-            positives, negatives, expected = entry
+            positives, negatives, workers, expected = entry
             with self.subTest(i=i, value=entry):
-                result = foil(target, background, masks, constants, positives, negatives)
+                result = foil(target, background, masks, constants, positives, negatives, workers)
 
                 assert_that(
                     result,
@@ -224,6 +360,68 @@ class LearningTest(TestCase):
                     ' negatives: List[Assignment]) -> List[Clause]:',
                 ).is_equal_to(expected)
 
+    def test__foil__negation(self):
+        for i, entry in enumerate([
+            ([Mask(False, 'edge', 2), Mask(True, 'edge', 2)], [Clause.parse('asym(X,Y) :- edge(X,Y), ~edge(Y,X).')]),
+            ([Mask(True, 'edge', 2), Mask(True, 'asym', 2), Mask(False, 'edge', 2)],
+             [Clause.parse('asym(X,Y) :- edge(X,Y), ~edge(Y,X).')]),
+        ]):
+            masks, expected = entry
+            with self.subTest(i=i, value=entry):
+                edges = [*background, Clause.parse('edge(1,0).'), Clause.parse('edge(8,7).')]
+                goal = Literal.parse('asym(X,Y)')
+                examples = [
+                    Example({'X': c.head.terms[0], 'Y': c.head.terms[1]}) for c in edges
+                    if Clause.parse('edge(%s,%s).' % tuple(reversed(c.head.terms))) not in edges
+                ]
+                positives, negatives = get_closure(goal, constants, [], examples)
+                result = foil(goal, edges, masks, constants, positives, negatives)
+
+                assert_that(
+                    result,
+                    'foil(target: Literal, background: List[Clause], positives: List[Assignment],'
+                    ' negatives: List[Assignment]) -> List[Clause]:',
+                ).is_equal_to(expected)
+
+    def test__foil__negation__bound(self):
+        for i, entry in enumerate([
+            ([(0, 2), (1, 2)], [
+                Clause.parse('t(X,Y) :- edge(X,Y), edge(V0,X), edge(V0,Y).'),
+                Clause.parse('t(X,Y) :- edge(X,Y), edge(V0,X), edge(V1,Y), ~edge(V0,V1).'),
+            ]),
+            ([(0, 1), (1, 2), (0, 2)], [Clause.parse('t(X,Y) :- edge(X,Y), edge(V0,X).')]),
+        ]):
+            pairs, expected = entry
+            with self.subTest(i=i, value=entry):
+                edges = Clause.parse_many(['edge(0,1).', 'edge(1,2).', 'edge(0,2).', 'edge(3,0).'])
+                goal = Literal.parse('t(X,Y)')
+                examples = [Example({'X': x, 'Y': y}) for x, y in pairs]
+                items = get_constants([l for c in edges for l in c.literals])
+                positives, negatives = get_closure(goal, items, [], examples)
+                result = foil(goal, edges, [Mask(True, 'edge', 2), Mask(False, 'edge', 2)], items, positives, negatives)
+
+                assert_that(
+                    result,
+                    'foil(target: Literal, background: List[Clause], positives: List[Assignment],'
+                    ' negatives: List[Assignment]) -> List[Clause]:',
+                ).is_equal_to(expected)
+
+    def test__foil__tracer(self):
+        for i, entry in enumerate([
+            (pos_0_0, neg_0_0, 0, {'clauses': 2, 'literals': 3, 'ground': 31, 'facts.derived': 176}),
+            (pos_0_0, neg_0_0, 2, {'clauses': 2, 'literals': 3, 'ground': 32, 'facts.derived': 185}),
+            (pos_0_0, [], 0, {'clauses': 0, 'literals': 0}),
+        ]):
+            positives, negatives, workers, expected = entry
+            with self.subTest(i=i, value=entry):
+                tracer = Tracer()
+                foil(target, background, masks, constants, positives, negatives, workers, tracer=tracer)
+                result = {k: tracer.counters[k] for k in expected}
+
+                assert_that(result, 'Tracer.count(self, name: str, value: int = 1):').is_equal_to(expected)
+                assert_that(tracer.counters['candidates.generated'], 'Tracer.count(self, name: str, value: int = 1):') \
+                    .is_equal_to(tracer.counters['candidates.scored'] + tracer.counters['candidates.pruned'])
+
     def test__exclude(self):
         for i, entry in enumerate([
             (pos_0_0, pos_0_1, pos_1_0),
@@ -286,6 +484,36 @@ class LearningTest(TestCase):
                     'max_gain(pos: List[Assignment], neg: List[Assignment]) -> float:',
                 ).is_equal_to(expected)
 
+    def test__get_dependents(self):
+        for i, entry in enumerate([
+            ([], {('path', 2)}),
+            (background, {('path', 2)}),
+            (hypotheses_1, {('path', 2)}),
+            ([
+                Clause.parse('hub(X) :- path(X,Y).'), Clause.parse('top(X) :- hub(X).'),
+                Clause.parse('far(X) :- edge(X,Y).'),
+            ], {('path', 2), ('hub', 1), ('top', 1)}),
+        ]):
+            clauses, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_dependents(target, clauses)
+
+                assert_that(result, 'get_dependents(target: Literal, clauses: List[Clause]) -> Set[Tuple[str, int]]:') \
+                    .is_equal_to(expected)
+
+    def test__bound_gain(self):
+        for i, entry in enumerate([
+            (0, 10, 10, 0.0),
+            (10, 10, 10, 10.000000000014427),
+            (5, 10, 30, 10.000000000007214),
+            (5, 0, 30, math.inf),
+        ]):
+            t, pos, neg, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = bound_gain(t, pos, neg)
+
+                assert_that(result, 'bound_gain(t: int, pos: int, neg: int) -> float:').is_equal_to(expected)
+
     def test__get_table(self):
         for i, entry in enumerate([
             ([target], {0: 'X', 1: 'Y'}),
@@ -305,6 +533,7 @@ class LearningTest(TestCase):
 
     def test__itemize(self):
         for i, entry in enumerate([
+            ({0: 'X'}, 0, []),
             ({0: 'X'}, 1, [['X']]),
             ({0: 'X'}, 2, [['V0', 'X'], ['X', 'V0'], ['X', 'X']]),
             ({0: 'X'}, 3, [
@@ -329,6 +558,16 @@ class LearningTest(TestCase):
                 ['Y', 'X'],
                 ['Y', 'Y'],
             ]),
+            ({0: 'X', 1: 'V0'}, 2, [
+                ['V1', 'X'],
+                ['V1', 'V0'],
+                ['X', 'V1'],
+                ['X', 'X'],
+                ['X', 'V0'],
+                ['V0', 'V1'],
+                ['V0', 'X'],
+                ['V0', 'V0'],
+            ]),
         ]):
             table, arity, expected = entry
             with self.subTest(i=i, value=entry):
@@ -337,42 +576,40 @@ class LearningTest(TestCase):
                 assert_that(
                     result,
                     'itemize(table: Dict[int, Variable], arity: int) -> List[List[Variable]]:',
-                ).contains_only(*expected)
+                ).is_length(len(expected))
+                if expected:
+                    assert_that(
+                        result,
+                        'itemize(table: Dict[int, Variable], arity: int) -> List[List[Variable]]:',
+                    ).contains_only(*expected)
 
-    def test__get_signature(self):
+    def test__itemize__constraints(self):
         for i, entry in enumerate([
-            ({0: 'X'}, (0, 1, 2), ['X', 'V0', 'V1']),
-            ({0: 'X', 1: 'Y'}, (0, 0), ['X', 'X']),
-            ({0: 'X', 1: 'Y'}, (0, 1), ['X', 'Y']),
-            ({0: 'X', 1: 'Y'}, (0, 2), ['X', 'V0']),
-            ({0: 'X', 1: 'Y'}, (1, 0), ['Y', 'X']),
-            ({0: 'X', 1: 'Y'}, (1, 1), ['Y', 'Y']),
-            ({0: 'X', 1: 'Y'}, (1, 2), ['Y', 'V0']),
-            ({0: 'X', 1: 'Y'}, (2, 0), ['V0', 'X']),
-            ({0: 'X', 1: 'Y'}, (2, 1), ['V0', 'Y']),
-            ({0: 'X', 1: 'Y'}, (2, 2), ['V0', 'V0']),
-            ({0: 'X', 1: 'Y'}, (0, 3), ['X', 'V0']),
-            ({0: 'X', 1: 'Y'}, (1, 3), ['Y', 'V0']),
-            ({0: 'X', 1: 'Y'}, (3, 0), ['V0', 'X']),
-            ({0: 'X', 1: 'Y'}, (3, 1), ['V0', 'Y']),
-            ({0: 'X', 1: 'Y'}, (3, 3), ['V0', 'V0']),
-            ({0: 'X', 1: 'Y'}, (0, 0, 0), ['X', 'X', 'X']),
-            ({0: 'X', 1: 'Y'}, (0, 0, 1), ['X', 'X', 'Y']),
-            ({0: 'X', 1: 'Y'}, (0, 1, 0), ['X', 'Y', 'X']),
-            ({0: 'X', 1: 'Y'}, (0, 1, 1), ['X', 'Y', 'Y']),
-            ({0: 'X', 1: 'Y'}, (1, 0, 0), ['Y', 'X', 'X']),
-            ({0: 'X', 1: 'Y'}, (1, 0, 1), ['Y', 'X', 'Y']),
-            ({0: 'X', 1: 'Y'}, (1, 1, 0), ['Y', 'Y', 'X']),
-            ({0: 'X', 1: 'Y'}, (1, 1, 1), ['Y', 'Y', 'Y']),
+            ({0: 'X', 1: 'Y'}, ['+', '-'], None, None, [['X', 'V0'], ['Y', 'V0']]),
+            ({0: 'X', 1: 'Y'}, ['-', '-'], None, None, []),
+            ({0: 'X', 1: 'Y'}, ['+', '+'], None, None, [['X', 'X'], ['X', 'Y'], ['Y', 'X'], ['Y', 'Y']]),
+            ({0: 'X', 1: 'Y'}, None, ['a', 'b'], {'X': 'a', 'Y': 'b'}, [['X', 'Y'], ['X', 'V0'], ['V0', 'Y']]),
+            ({0: 'X'}, None, ['a', 'b', 'b'], {'X': 'a'}, [['X', 'V0', 'V0'], ['X', 'V0', 'V1']]),
+            ({0: 'X'}, ['?', '-', '+'], ['a', 'b', 'a'], {'X': 'a'}, [['X', 'V0', 'X'], ['V0', 'V1', 'X']]),
         ]):
-            table, combination, expected = entry
+            table, modes, types, typing, expected = entry
             with self.subTest(i=i, value=entry):
-                result = get_signature(table, combination)
+                result = itemize(table, len(modes or types), modes, types, typing)
 
-                assert_that(
-                    result,
-                    'get_signature(table: Dict[int, Variable], combination: Tuple[int, ...]) -> List[Variable]:',
-                ).is_equal_to(expected)
+                if not expected:
+                    assert_that(
+                        result,
+                        'itemize(table: Dict[int, Variable], arity: int, modes: Sequence[Optional[str]] = None,'
+                        ' types: Sequence[Optional[str]] = None, typing: Dict[Variable, str] = None)'
+                        ' -> List[List[Variable]]:',
+                    ).is_empty()
+                else:
+                    assert_that(
+                        result,
+                        'itemize(table: Dict[int, Variable], arity: int, modes: Sequence[Optional[str]] = None,'
+                        ' types: Sequence[Optional[str]] = None, typing: Dict[Variable, str] = None)'
+                        ' -> List[List[Variable]]:',
+                    ).contains_only(*expected).is_length(len(expected))
 
     def test__extend(self):
         for i, entry in enumerate([
@@ -395,6 +632,20 @@ class LearningTest(TestCase):
                 else:
                     assert_that(result, 'extend').contains_only(*expected)
 
+    def test__extend__domains(self):
+        for i, entry in enumerate([
+            ([{'X': 0}, {'X': 3}], edge_x_v0, None, [{'X': 0, 'V0': 1}, {'X': 0, 'V0': 3}, {'X': 3, 'V0': 2},
+                                                     {'X': 3, 'V0': 4}]),
+            ([{'X': 0}, {'X': 3}], edge_x_v0, [None, {2, 3}], [{'X': 0, 'V0': 3}, {'X': 3, 'V0': 2}]),
+            ([{'X': 0}, {'X': 3}], edge_x_v0, [{3}, None], [{'X': 3, 'V0': 2}, {'X': 3, 'V0': 4}]),
+        ]):
+            examples, literal, domains, expected = entry
+            world = [l for c in background for l in c.literals]
+            with self.subTest(i=i, value=entry):
+                result = extend(examples, literal, constants, world, domains)
+
+                assert_that(result, 'extend').contains_only(*expected)
+
     def test__gain(self):
         for i, entry in enumerate([
             (pos_0_0, neg_0_0, pos_0_1, neg_0_1, 20.91922489442482),
@@ -1,3 +1,4 @@
+import io
 from unittest import TestCase
 
 from assertpy import assert_that
@@ -6,10 +7,28 @@ from foil.models import Atom
 from foil.models import Clause
 from foil.models import Literal
 from foil.models import Mask
+from foil.models import Program
 
 
-class MaskTest(TestCase):  # TODO
-    pass
+class MaskTest(TestCase):
+
+    def test__parse(self):
+        for i, entry in enumerate([
+            ('edge', Mask(False, 'edge', 0, [], []), 'edge()'),
+            ('~edge(node,node)', Mask(True, 'edge', 2, [None, None], ['node', 'node']), '~edge(node,node)'),
+            ('edge(+node,-node)', Mask(False, 'edge', 2, ['+', '-'], ['node', 'node']), 'edge(+node,-node)'),
+            ('edge(+,node)', Mask(False, 'edge', 2, ['+', None], [None, 'node']), 'edge(+,node)'),
+        ]):
+            content, expected, text = entry
+            with self.subTest(i=i, value=entry):
+                result = Mask.parse(content)
+
+                assert_that(result, 'Mask.parse(content: str) -> Mask:').is_equal_to(expected)
+                assert_that(result.modes, 'Mask.modes(self) -> Optional[Tuple[Optional[str], ...]]:') \
+                    .is_equal_to(expected.modes)
+                assert_that(result.types, 'Mask.types(self) -> Optional[Tuple[Optional[str], ...]]:') \
+                    .is_equal_to(expected.types)
+                assert_that(repr(result), 'Mask.__repr__(self) -> str:').is_equal_to(text)
 
 
 class AtomTest(TestCase):
@@ -225,6 +244,20 @@ class LiteralTest(TestCase):
                 assert_that(result, 'Literal.get_mask(self) -> Mask:') \
                     .is_equal_to(expected)
 
+    def test__get_positive(self):
+        for i, entry in enumerate([
+            (Literal.parse('func'), Literal.parse('func')),
+            (Literal.parse('func(term, X)'), Literal.parse('func(term, X)')),
+            (Literal.parse('~func'), Literal.parse('func')),
+            (Literal.parse('~func(term, X)'), Literal.parse('func(term, X)')),
+        ]):
+            literal, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = literal.get_positive()
+
+                assert_that(result, 'Literal.get_positive(self) -> Literal:') \
+                    .is_equal_to(expected)
+
     def test__is_ground(self):
         for i, entry in enumerate([
             (Literal.parse('func'), True),
@@ -468,6 +501,23 @@ class ClauseTest(TestCase):
                 assert_that(result, 'Clause.parse(content: str) -> Clause:') \
                     .is_equal_to(expected)
 
+    def test__parse_many(self):
+        for i, entry in enumerate([
+            ([], []),
+            (['func.'], [Clause(Literal(Atom('func')))]),
+            (['func(term).', '~func :- pred.', 'func(term).'], [
+                Clause(Literal(Atom('func', ['term']))),
+                Clause(Literal(Atom('func'), True), [Literal(Atom('pred'))]),
+                Clause(Literal(Atom('func', ['term']))),
+            ]),
+        ]):
+            contents, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Clause.parse_many(contents)
+
+                assert_that(result, 'Clause.parse_many(contents: Iterable[str]) -> List[Clause]:') \
+                    .is_equal_to(expected)
+
     def test__get_arity(self):
         for i, entry in enumerate([
             (Clause.parse('func.'), 0),
@@ -662,11 +712,53 @@ class ClauseTest(TestCase):
                 assert_that(result, 'Clause.substitute(self, substitution: Substitution) -> Clause:') \
                     .is_equal_to(expected)
 
+    def test__normalize(self):
+        for i, entry in enumerate([
+            ('edge(0,1).', 'edge(0,1).'),
+            ('path(X,Y) :- edge(X,Y).', 'path(V0,V1) :- edge(V0,V1).'),
+            ('path(A,B) :- edge(A,C), path(C,B).', 'path(V0,V1) :- edge(V0,V2), path(V2,V1).'),
+            ('path(V1,V0) :- edge(V1,V0).', 'path(V0,V1) :- edge(V0,V1).'),
+        ]):
+            clause, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Clause.parse(clause).normalize()
+
+                assert_that(result, 'Clause.normalize(self) -> Clause:').is_equal_to(Clause.parse(expected))
+
 
 class ProgramTest(TestCase):
 
-    def test__parse(self):  # TODO
-        pass
+    def test__parse(self):
+        for i, entry in enumerate([
+            ('edge(0,1).', [], ['edge(0,1).']),
+            (':- edge(+node,-node). edge(0,1).', ['edge(+node,-node)'], ['edge(0,1).']),
+        ]):
+            content, declarations, clauses = entry
+            with self.subTest(i=i, value=entry):
+                result = Program.parse(content)
+
+                assert_that(result.declarations, 'Program.declarations(self) -> Iterable[Mask]:') \
+                    .is_equal_to([Mask.parse(d) for d in declarations])
+                assert_that(result.clauses, 'Program.clauses(self) -> Iterable[Clause]:') \
+                    .is_equal_to([Clause.parse(c) for c in clauses])
+
+    def test__iter_parse(self):
+        for i, entry in enumerate([
+            '',
+            'edge(0,1). edge(1,2).',
+            'edge(0,1). % edge(1,2).\npath(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).',
+            'p(1.5, "a. b", \'c\', TRUE). ~q(-3). r.',
+            ':- edge(+node,-node). edge(0,1).',
+        ]):
+            content = entry
+            with self.subTest(i=i, value=entry):
+                result = list(Program.iter_parse(io.StringIO(content), 4))
+
+                assert_that(
+                    result,
+                    'Program.iter_parse(source: Union[str, PathLike, TextIO], size: int = 65536)'
+                    ' -> Iterable[Union[Mask, Clause, Example]]:',
+                ).is_equal_to([*Program.parse(content).declarations, *Program.parse(content).clauses])
 
     def test__get_clause(self):  # TODO
         pass
@@ -683,8 +775,39 @@ class ProgramTest(TestCase):
     def test__is_ground(self):  # TODO
         pass
 
-    def test__resolve(self):  # TODO
-        pass
+    def test__get_candidates(self):
+        source = 'edge(0,1). edge(0,3). edge(X,X). edge(1,2). ~edge(0,1). path(X,Y) :- edge(X,Y). edge(3,2).'
+        for i, entry in enumerate([
+            ('edge(0,1)', [0, 2]),
+            ('edge(0,Y)', [0, 1, 2]),
+            ('edge(1,2)', [2, 3]),
+            ('edge(5,2)', [2]),
+            ('edge(X,2)', [2, 3, 6]),
+            ('edge(X,Y)', [0, 1, 2, 3, 6]),
+            ('~edge(0,1)', [4]),
+            ('path(0,1)', [5]),
+            ('path(0)', []),
+        ]):
+            query, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Program.parse(source).get_candidates(Literal.parse(query))
+
+                assert_that(result, 'Program.get_candidates(self, query: Literal) -> List[int]:') \
+                    .is_equal_to(expected)
+
+    def test__resolve(self):
+        source = 'edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).'
+        for i, entry in enumerate([
+            ('edge(1,2)', [(1, 'edge(1,2)', {})]),
+            ('path(0,1)', [(2, 'path(0,1)', {'X': 0, 'Y': 1}), (0, 'edge(0,1)', {})]),
+            ('path(0,2)', None),
+        ]):
+            query, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = Program.parse(source).resolve(Literal.parse(query))
+
+                assert_that(result, 'Program.resolve(self, query: Literal) -> Optional[Derivation]:') \
+                    .is_equal_to(expected and [(j, Literal.parse(l), s) for j, l, s in expected])
 
     def test__ground(self):  # TODO
         pass
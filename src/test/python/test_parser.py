@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.language.grammar import clause
+from foil.language.grammar import literal
+from foil.language.parser import get_parser
+from foil.language.parser import parse
+from foil.models import Clause
+
+
+class ParserTest(TestCase):
+
+    def test__get_parser(self):
+        for i, entry in enumerate([
+            (clause, clause, True),
+            (clause, literal, False),
+        ]):
+            rule_1, rule_2, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_parser(rule_1) is get_parser(rule_2)
+
+                assert_that(result, 'get_parser(rule: Callable) -> ParserPython:').is_equal_to(expected)
+
+    def test__parse(self):
+        contents = ['edge(%d,%d).' % (i, i + 1) for i in range(200)]
+        with ThreadPoolExecutor(4) as executor:
+            result = list(executor.map(lambda c: parse(clause, c), contents))
+
+        assert_that(result, 'parse(rule: Callable, content: str) -> Any:') \
+            .is_equal_to([Clause.parse(c) for c in contents])
@@ -0,0 +1,44 @@
+import io
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.language.reader import read_fact
+from foil.language.reader import split
+from foil.models import Clause
+
+
+class ReaderTest(TestCase):
+
+    def test__split(self):
+        for i, entry in enumerate([
+            ('', 4, []),
+            ('% only a comment', 4, []),
+            ('p(1). q(2.5).', 4, ['p(1).', 'q(2.5).']),
+            ('p("a.b"). % c.\nq :- r(X).', 3, ['p("a.b").', 'q :- r(X).']),
+            ("p('%'). q(.5).", 2, ["p('%').", 'q(.5).']),
+            ('p(1). q(2)', 4, ['p(1).', 'q(2)']),
+        ]):
+            content, size, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = list(split(io.StringIO(content), size))
+
+                assert_that(result, 'split(stream: TextIO, size: int = 65536) -> Iterable[str]:') \
+                    .is_equal_to(expected)
+
+    def test__read_fact(self):
+        for i, entry in enumerate([
+            ('p.', Clause.parse('p.')),
+            ('edge( 0 , 1 ).', Clause.parse('edge(0,1).')),
+            ('p(a, -2, 1.5E3, .5, TRUE, false).', Clause.parse('p(a, -2, 1.5E3, .5, TRUE, false).')),
+            ('p(X).', None),
+            ('p("a").', None),
+            ('~p(a).', None),
+            ('p(a) :- q(a).', None),
+            ('p(trueish).', None),
+        ]):
+            statement, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = read_fact(statement)
+
+                assert_that(result, 'read_fact(statement: str) -> Optional[Clause]:').is_equal_to(expected)
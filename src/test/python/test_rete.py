@@ -4,11 +4,17 @@ from assertpy import assert_that
 
 from foil.models import Clause
 from foil.models import Literal
+from foil.models import Program
 from foil.rete import Alpha
 from foil.rete import Beta
+from foil.rete import build
+from foil.rete import Delta
 from foil.rete import Engine
 from foil.rete import ground
 from foil.rete import Leaf
+from foil.rete import Memory
+from foil.rete import plan
+from foil.rete import rename
 from foil.rete import Root
 
 
@@ -26,6 +32,31 @@ class RootTest(TestCase):
                     .is_equal_to(expected)
 
 
+class MemoryTest(TestCase):
+
+    def test__index(self):
+        for i, entry in enumerate([
+            ([], ('X',), {}),
+            ([((Literal.parse('p(0,1)'),), {'X': 0, 'Y': 1})], (), {(): {(Literal.parse('p(0,1)'),): {'X': 0, 'Y': 1}}}),
+            ([((Literal.parse('p(0,1)'),), {'X': 0, 'Y': 1}), ((Literal.parse('p(0,2)'),), {'X': 0, 'Y': 2})], ('X',), {
+                (0,): {(Literal.parse('p(0,1)'),): {'X': 0, 'Y': 1}, (Literal.parse('p(0,2)'),): {'X': 0, 'Y': 2}},
+            }),
+            ([((Literal.parse('p(0,1)'),), {'X': 0, 'Y': 1}), ((Literal.parse('p(0,2)'),), {'X': 0, 'Y': 2})], ('Y',), {
+                (1,): {(Literal.parse('p(0,1)'),): {'X': 0, 'Y': 1}},
+                (2,): {(Literal.parse('p(0,2)'),): {'X': 0, 'Y': 2}},
+            }),
+        ]):
+            payloads, keys, expected = entry
+            with self.subTest(i=i, value=entry):
+                memory = Memory()
+                for ground, subst in payloads:
+                    memory._store(ground, subst)
+                result = memory.index(keys)
+
+                assert_that(result, 'Memory.index(self, keys: Tuple[Variable, ...]) -> Index:') \
+                    .is_equal_to(expected)
+
+
 class AlphaTest(TestCase):
 
     def test__notify(self):
@@ -59,7 +90,7 @@ class LeafTest(TestCase):
 
     def test__notify(self):
         for i, entry in enumerate([
-            (Leaf(Clause.parse('fact(X).'), Alpha(Literal.parse('fact(X)'), Root()), Root(), []),
+            (Leaf(Clause.parse('fact(X).'), Alpha(Literal.parse('fact(X)'), Root()), Root()),
              [Literal.parse('fact(0).')], {}, Alpha(Literal.parse('fact(X)'), Root()), None),
         ]):
             leaf, fact, subst, parent, expected = entry
@@ -94,9 +125,289 @@ class EngineTest(TestCase):
                 assert_that(result, 'Engine.insert(self, fact: Clause):') \
                     .is_equal_to(expected)
 
+    def test__retract(self):
+        for i, entry in enumerate([
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', 'edge(1,2).', ['edge(0,1)', 'path(0,1)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).', 'edge(1,2).',
+             ['edge(0,1)', 'path(0,1)']),
+            ('edge(0,1). edge(1,0). path(X,Y) :- edge(X,Y). path(X,Y) :- path(X,Z), path(Z,Y).', 'edge(1,0).',
+             ['edge(0,1)', 'path(0,1)']),
+            ('edge(0,1). edge(0,2). edge(2,1). path(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).',
+             'edge(0,1).', ['edge(0,2)', 'edge(2,1)', 'path(0,2)', 'path(2,1)', 'path(0,1)']),
+        ]):
+            source, fact, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse(source))
+                engine.retract(Clause.parse(fact))
+
+                assert_that(engine.facts, 'Engine.retract(self, fact: Clause):') \
+                    .contains_only(*[Literal.parse(e) for e in expected])
+
+    def test__unload(self):
+        for i, entry in enumerate([
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', 'path(X,Y) :- edge(X,Y).', ['edge(0,1)', 'edge(1,2)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).',
+             'path(X,Y) :- edge(X,Z), path(Z,Y).', ['edge(0,1)', 'edge(1,2)', 'path(0,1)', 'path(1,2)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y). path(X,Y) :- edge(X,Z), path(Z,Y).',
+             'path(X,Y) :- edge(X,Y).', ['edge(0,1)', 'edge(1,2)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', 'edge(0,1).', ['edge(1,2)', 'path(1,2)']),
+        ]):
+            source, clause, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse(source))
+                engine.unload(Clause.parse(clause))
+
+                assert_that(engine.facts, 'Engine.unload(self, clause: Clause):') \
+                    .contains_only(*[Literal.parse(e) for e in expected])
+
+    def test__derive(self):
+        for i, entry in enumerate([
+            ('edge(0,1). edge(1,2).', 'path(X,Y) :- edge(X,Y).', ['path(0,1)', 'path(1,2)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', 'path(X,Y) :- edge(X,Z), path(Z,Y).', ['path(0,2)']),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', 'path(X,Y) :- edge(X,Y), edge(Y,X).', []),
+            ('edge(0,1). edge(1,2). sym(0,0). path(X,Y) :- edge(X,Y).', 'path(X,Y) :- ~sym(X,Y), path(Y,X).',
+             ['path(1,0)', 'path(2,1)']),
+            ('edge(0,1). path(X,Y) :- edge(X,Y).', 'edge(1,2).', ['edge(1,2)']),
+        ]):
+            source, clause, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse(source))
+                before, counts = engine.facts, {k: v for k, v in engine._root.counts.items() if v}
+                result = engine.derive(Clause.parse(clause))
+
+                assert_that(result, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .is_equal_to(Delta(tuple(Literal.parse(e) for e in expected), ()))
+                assert_that(engine.facts, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .contains_only(*before)
+                after = {k: v for k, v in engine._root.counts.items() if v}
+                assert_that(after, 'Engine.derive(self, clause: Clause) -> Delta:').is_equal_to(counts)
+
+    def test__derive__cache(self):
+        for i, entry in enumerate([
+            (1 << 20, ['path(X,Y) :- edge(X,Y).', 'path(A,B) :- edge(A,B).'], ['edge(1,2).'], 'path(X,Y) :- edge(X,Y).',
+             ['path(0,1)', 'path(1,2)']),
+            (1 << 20, ['path(X,Y) :- edge(X,Y).'], ['edge(1,2).', 'path(X,Y) :- edge(Y,X).'], 'path(A,B) :- edge(A,B).',
+             ['path(0,1)', 'path(1,2)']),
+            (0, ['path(X,Y) :- edge(X,Y).'], ['edge(1,2).'], 'path(X,Y) :- edge(X,Y).', ['path(0,1)', 'path(1,2)']),
+        ]):
+            budget, before, loads, clause, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = Engine(budget)
+                engine.load(Clause.parse('edge(0,1).'))
+                engine.insert(Clause.parse('edge(0,1).'))
+                for other in before:
+                    engine.derive(Clause.parse(other))
+                for other in loads:
+                    engine.load(Clause.parse(other))
+                    if Clause.parse(other).is_fact():
+                        engine.insert(Clause.parse(other))
+                result = engine.derive(Clause.parse(clause))
+
+                assert_that(result.added, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .contains_only(*[Literal.parse(e) for e in expected])
+
+    def test__load__sharing(self):
+        for i, entry in enumerate([
+            (['p(X) :- edge(X,Y).', 'q(A) :- edge(A,B).'], ['edge(V0,V1)']),
+            (['p(X) :- edge(X,Y), red(Y).', 'q(A) :- edge(A,B), red(B).'],
+             ['edge(V0,V1)', 'red(V0)', 'edge(V0,V1), red(V1)']),
+            (['p(X) :- edge(X,Y), red(Y).', 'q(A) :- edge(A,B), red(A).'],
+             ['edge(V0,V1)', 'red(V0)', 'edge(V0,V1), red(V1)', 'edge(V0,V1), red(V0)']),
+            (['p(X,Z) :- edge(X,Y), edge(Y,Z).', 'q(A) :- edge(A,B), edge(B,C), red(C).'],
+             ['edge(V0,V1)', 'edge(V0,V1), edge(V1,V2)', 'red(V0)', 'edge(V0,V1), edge(V1,V2), red(V2)']),
+        ]):
+            rules, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse('edge(0,1). red(1). red(2).'))
+                for rule in rules:
+                    engine.load(Clause.parse(rule))
+                result = [s.name for s in engine.statistics() if s.kind != 'leaf']
+
+                assert_that(result, 'Engine.load(self, clause: Clause):').is_equal_to(expected)
+
+    def test__derive__sharing(self):
+        for i, entry in enumerate([
+            (16, ['p(X) :- edge(X,Y), red(Y).', 'p(X) :- edge(X,Y), edge(Y,Z).'], ['edge(V0,V1)']),
+            (16, ['p(X) :- edge(X,Y), red(Y), edge(Y,Z).', 'p(A) :- edge(A,B), red(B), red(A).'],
+             ['edge(V0,V1)', 'red(V0)', 'edge(V0,V1), red(V1)']),
+            (0, ['p(X) :- edge(X,Y), red(Y), edge(Y,Z).', 'p(A) :- edge(A,B), red(B), red(A).'], []),
+            (16, ['red(X) :- edge(X,Y), red(Y), edge(Y,Z).'], []),
+        ]):
+            retain, clauses, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = Engine(retain=retain)
+                for fact in Clause.parse_many(['edge(0,1).', 'red(1).', 'red(2).']):
+                    engine.load(fact)
+                    engine.insert(fact)
+                for clause in clauses:
+                    engine.derive(Clause.parse(clause))
+                result = [s.name for s in engine.statistics()]
+
+                assert_that(result, 'Engine.derive(self, clause: Clause) -> Delta:').is_equal_to(expected)
+
+    def test__load__negation(self):
+        for i, entry in enumerate([
+            ('node(0). node(1). node(2). edge(0,1). sink(X) :- ~edge(X,Y), node(X).',
+             ['node(0)', 'node(1)', 'node(2)', 'edge(0,1)', 'sink(1)', 'sink(2)']),
+            ('node(0). node(1). edge(0,1). far(X,Y) :- node(X), node(Y), ~path(X,Y). path(X,Y) :- edge(X,Y).',
+             ['node(0)', 'node(1)', 'edge(0,1)', 'path(0,1)', 'far(0,0)', 'far(1,0)', 'far(1,1)']),
+            ('node(0). ~red(0). blue(X) :- node(X), ~red(X).', ['node(0)', '~red(0)', 'blue(0)']),
+            ('edge(0,1). none :- ~edge(X,Y). some :- ~none.', ['edge(0,1)', 'some']),
+            ('edge(0,1). edge(1,0). edge(1,2). asym(X,Y) :- edge(X,Y), ~edge(Y,X).',
+             ['edge(0,1)', 'edge(1,0)', 'edge(1,2)', 'asym(1,2)']),
+            ('q(1). s(X) :- q(X), true. p :- ~r.', ['q(1)', 'p']),
+            ('p :- ~r. q(1). s(X) :- q(X), true.', ['q(1)', 'p']),
+            ('true. q(1). s(X) :- q(X), true. p :- ~r.', ['true', 'q(1)', 's(1)', 'p']),
+        ]):
+            source, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = build(Program.parse(source)).facts
+
+                assert_that(result, 'Engine.load(self, clause: Clause):') \
+                    .contains_only(*[Literal.parse(e) for e in expected])
+
+    def test__load__stratify(self):
+        for i, entry in enumerate([
+            ['p(X) :- node(X), ~p(X).'],
+            ['p(X) :- node(X), ~q(X).', 'q(X) :- node(X), ~p(X).'],
+        ]):
+            rules = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse('node(0).'))
+                for rule in rules[:-1]:
+                    engine.load(Clause.parse(rule))
+
+                assert_that(engine.load, 'Engine.load(self, clause: Clause):') \
+                    .raises(ValueError).when_called_with(Clause.parse(rules[-1]))
+                assert_that(engine.facts, 'Engine.load(self, clause: Clause):') \
+                    .contains_only(*[Literal.parse(e) for e in ['node(0)', *(['p(0)'] if rules[:-1] else [])]])
+
+    def test__insert__negation(self):
+        for i, entry in enumerate([
+            ([('load', 'edge(1,0).'), ('insert', 'edge(1,0).')], ['node(0)', 'node(1)', 'edge(0,1)', 'edge(1,0)']),
+            ([('retract', 'edge(0,1).')], ['node(0)', 'node(1)', 'sink(0)', 'sink(1)']),
+            ([('load', 'edge(1,1).'), ('insert', 'edge(1,1).'), ('retract', 'edge(1,1).')],
+             ['node(0)', 'node(1)', 'edge(0,1)', 'sink(1)']),
+            ([('unload', 'sink(X) :- node(X), ~edge(X,Y).')], ['node(0)', 'node(1)', 'edge(0,1)']),
+        ]):
+            operations, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse('node(0). node(1). edge(0,1). sink(X) :- node(X), ~edge(X,Y).'))
+                for operation, clause in operations:
+                    getattr(engine, operation)(Clause.parse(clause))
+
+                assert_that(engine.facts, 'Engine.insert(self, fact: Clause):') \
+                    .contains_only(*[Literal.parse(e) for e in expected])
+
+    def test__derive__negation(self):
+        for i, entry in enumerate([
+            ('sink(X) :- node(X), ~edge(X,Y).', ['sink(1)'], []),
+            ('edge(X,X) :- node(X).', ['edge(0,0)', 'edge(1,1)'], ['lone(1)']),
+            ('edge(X,Y) :- node(X), node(Y).', ['edge(0,0)', 'edge(1,0)', 'edge(1,1)'], ['lone(1)']),
+        ]):
+            clause, added, removed = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse('node(0). node(1). edge(0,1). lone(X) :- node(X), ~edge(X,Y).'))
+                before = engine.facts
+                result = engine.derive(Clause.parse(clause))
+
+                assert_that({*result.added}, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .is_equal_to({Literal.parse(e) for e in added})
+                assert_that({*result.removed}, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .is_equal_to({Literal.parse(e) for e in removed})
+                assert_that(engine.facts, 'Engine.derive(self, clause: Clause) -> Delta:') \
+                    .contains_only(*before)
+
+    def test__statistics(self):
+        for i, entry in enumerate([
+            ('edge(0,1).', []),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Y).', [
+                ('alpha', 'edge(V0,V1)', 2, 4, 0),
+                ('leaf', 'path(X,Y) :- edge(X,Y).', 2, 2, 0),
+            ]),
+            ('edge(0,1). edge(1,2). path(X,Y) :- edge(X,Z), edge(Z,Y).', [
+                ('alpha', 'edge(V0,V1)', 2, 3, 0),
+                ('beta', 'edge(V0,V1), edge(V1,V2)', 1, 2, 2),
+                ('leaf', 'path(X,Y) :- edge(X,Z), edge(Z,Y).', 1, 1, 0),
+            ]),
+        ]):
+            source, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = [s[:5] for s in build(Program.parse(source)).statistics()]
+
+                assert_that(result, 'Engine.statistics(self) -> List[Statistics]:').is_equal_to(expected)
+
+    def test__profile(self):
+        for i, entry in enumerate([
+            (False, False),
+            (True, True),
+        ]):
+            timing, expected = entry
+            with self.subTest(i=i, value=entry):
+                engine = build(Program.parse('edge(0,1). path(X,Y) :- edge(X,Z), edge(Z,Y).'))
+                engine.profile(timing)
+                engine.reset()
+                engine.insert(Clause.parse('edge(1,2).'))
+                result = [s.time > 0 for s in engine.statistics()]
+
+                assert_that(result, 'Engine.profile(self, timing: bool = True):').is_equal_to([expected] * 3)
+
+    def test__to_dot(self):
+        for i, entry in enumerate([
+            ('edge(0,1).', ['digraph rete {', '    root [label="root\\n1 facts", shape=box];', '}']),
+            ('edge(0,1). path(X,Y) :- edge(X,Y).', [
+                'digraph rete {',
+                '    root [label="root\\n2 facts", shape=box];',
+                '    n0 [label="edge(V0,V1)\\n1 items", shape=ellipse];',
+                '    root -> n0;',
+                '    n1 [label="path(X,Y) :- edge(X,Y).\\n1 items", shape=box];',
+                '    n0 -> n1;',
+                '}',
+            ]),
+        ]):
+            source, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = build(Program.parse(source)).to_dot()
+
+                assert_that(result, 'Engine.to_dot(self) -> str:').is_equal_to('\n'.join(expected))
+
 
 class ReteTest(TestCase):
 
+    def test__plan(self):
+        sizes = {'big': 100, 'small': 1, 'mid': 10}
+        for i, entry in enumerate([
+            ([], []),
+            (['big(X,Y)', 'small(Y,Z)'], ['small(Y,Z)', 'big(X,Y)']),
+            (['big(X,Y)', 'mid(Y,Z)', 'small(W,V)'], ['small(W,V)', 'mid(Y,Z)', 'big(X,Y)']),
+            (['big(X,Y)', 'small(Z,W)', 'mid(Y,Z)'], ['small(Z,W)', 'mid(Y,Z)', 'big(X,Y)']),
+            (['~small(X)', 'big(X,Y)'], ['big(X,Y)', '~small(X)']),
+            (['mid(X,Y)', '~small(Y)', 'big(Y,Z)'], ['mid(X,Y)', '~small(Y)', 'big(Y,Z)']),
+            (['big(X,Y)', 'big(Y,Z)'], ['big(X,Y)', 'big(Y,Z)']),
+        ]):
+            body, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = plan([Literal.parse(l) for l in body], lambda l: sizes[l.functor])
+
+                assert_that(
+                    result,
+                    'plan(body: Iterable[Literal], estimate: Callable[[Literal], float]) -> List[Literal]:',
+                ).is_equal_to([Literal.parse(l) for l in expected])
+
+    def test__rename(self):
+        for i, entry in enumerate([
+            ([], {}),
+            (['p(0)'], {}),
+            (['p(X,Y)'], {'X': 'V0', 'Y': 'V1'}),
+            (['p(Y,X,Y)', 'q(Z,X)'], {'Y': 'V0', 'X': 'V1', 'Z': 'V2'}),
+            (['p(V1,V0)'], {'V1': 'V0', 'V0': 'V1'}),
+        ]):
+            literals, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = rename([Literal.parse(l) for l in literals])
+
+                assert_that(result, 'rename(literals: Iterable[Literal]) -> Substitution:').is_equal_to(expected)
+
     def test__ground(self):
         for i, entry in enumerate([
             # TODO
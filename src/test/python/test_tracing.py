@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.tracing import Tracer
+
+
+class TracerTest(TestCase):
+
+    def test__count(self):
+        for i, entry in enumerate([
+            ([], {}),
+            ([('ground', 1)], {'ground': 1}),
+            ([('ground', 1), ('facts', 5), ('ground', 2)], {'ground': 3, 'facts': 5}),
+        ]):
+            counts, expected = entry
+            with self.subTest(i=i, value=entry):
+                tracer = Tracer()
+                for name, value in counts:
+                    tracer.count(name, value)
+
+                assert_that(dict(tracer.counters), 'Tracer.count(self, name: str, value: int = 1):') \
+                    .is_equal_to(expected)
+
+    def test__phase(self):
+        for i, entry in enumerate([
+            ([], []),
+            (['derive'], ['derive']),
+            (['derive', 'score', 'derive'], ['derive', 'score']),
+        ]):
+            phases, expected = entry
+            with self.subTest(i=i, value=entry):
+                tracer = Tracer()
+                for name in phases:
+                    with tracer.phase(name):
+                        pass
+
+                assert_that(sorted(tracer.timings), 'Tracer.phase(self, name: str) -> Iterator[None]:') \
+                    .is_equal_to(expected)
+                assert_that(sorted(tracer.report()), 'Tracer.report(self) -> Dict[str, float]:') \
+                    .is_equal_to(['time.%s' % e for e in expected])
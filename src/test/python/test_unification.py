@@ -2,13 +2,18 @@ from unittest import TestCase
 
 from assertpy import assert_that
 
+from foil.models import Literal
+from foil.models import Program
 from foil.unification import assign
 from foil.unification import equate
+from foil.unification import get_variant
 from foil.unification import is_ground
 from foil.unification import is_variable
 from foil.unification import normalize
 from foil.unification import resolve
 from foil.unification import simplify
+from foil.unification import Step
+from foil.unification import SymbolTable
 from foil.unification import unify
 
 
@@ -302,14 +307,74 @@ class UnificationTest(TestCase):
                 assert_that(result, 'simplify(subst: Substitution) -> Optional[Substitution]:') \
                     .is_equal_to(expected)
 
-    def test__resolve(self):
+    def test__intern(self):
         for i, entry in enumerate([
-            # TODO
+            ([], 'a', 0),
+            (['a'], 'a', 0),
+            (['a'], 'b', 1),
+            (['a', 'b'], 'a', 0),
+            (['a', 1], 1, 1),
+            (['a', 1], 1.0, 2),
+            (['a', 1], True, 2),
+            (['a', 'True'], True, 1),
+            (['a', '"b"'], 'b', 2),
         ]):
-            program, query, cache, expected = entry
+            interned, term, expected = entry
             with self.subTest(i=i, value=entry):
-                result = resolve(program, query, cache)
+                table = SymbolTable()
+                for item in interned:
+                    table.intern(item)
+                result = table.intern(term)
 
-                assert_that(result,
-                            'resolve(program: Program, query: Literal, cache: bool = True) -> Optional[Derivation]:') \
+                assert_that(result, 'SymbolTable.intern(self, term: Term) -> int:') \
                     .is_equal_to(expected)
+
+    def test__resolve(self):
+        source = 'edge(0,1). edge(1,2). edge(2,0). edge(2,3). red(3). ' \
+                 'path(X,Y) :- edge(X,Y). path(X,Y) :- path(X,Z), edge(Z,Y). goal(X) :- edge(X,Y), red(Y).'
+        for i, entry in enumerate([
+            ('edge(0,1)', [(0, 'edge(0,1)', {})]),
+            ('edge(1,0)', None),
+            ('path(0,1)', [(5, 'path(0,1)', {'X': 0, 'Y': 1}), (0, 'edge(0,1)', {})]),
+            ('path(0,2)', [(6, 'path(0,2)', {'X': 0, 'Y': 2, 'Z': 1}), (5, 'path(0,1)', {'X': 0, 'Y': 1}),
+                           (0, 'edge(0,1)', {}), (1, 'edge(1,2)', {})]),
+            ('path(3,0)', None),
+            ('goal(2)', [(7, 'goal(2)', {'X': 2, 'Y': 3}), (3, 'edge(2,3)', {}), (4, 'red(3)', {})]),
+            ('goal(1)', None),
+        ]):
+            query, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = resolve(Program.parse(source), Literal.parse(query))
+
+                assert_that(result, 'resolve(program: Program, query: Literal) -> Optional[Derivation]:') \
+                    .is_equal_to(expected and [Step(j, Literal.parse(l), s) for j, l, s in expected])
+
+    def test__resolve__non_ground(self):
+        for i, entry in enumerate([
+            ('p(X) :- q(X,Z). q(1,W).', 'p(1)', [(0, 'p(1)', {'X': 1}), (1, 'q(1,V0)', {})]),
+            ('p(X) :- q(X,Z), r(Z). q(1,W). r(2).', 'p(1)',
+             [(0, 'p(1)', {'X': 1, 'Z': 2}), (1, 'q(1,V0)', {}), (2, 'r(2)', {})]),
+            ('p(X) :- q(X,X). q(W,W).', 'p(3)', [(0, 'p(3)', {'X': 3}), (1, 'q(3,3)', {'W': 3})]),
+            ('p(X) :- q(X,Z). q(2,W).', 'p(1)', None),
+        ]):
+            source, query, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = resolve(Program.parse(source), Literal.parse(query))
+
+                assert_that(result, 'resolve(program: Program, query: Literal) -> Optional[Derivation]:') \
+                    .is_equal_to(expected and [Step(j, Literal.parse(l), s) for j, l, s in expected])
+
+    def test__get_variant(self):
+        for i, entry in enumerate([
+            ('edge(X,Y)', 'edge(A,B)', True),
+            ('edge(X,Y)', 'edge(Y,X)', True),
+            ('edge(X,X)', 'edge(X,Y)', False),
+            ('edge(X,1)', 'edge(Y,1)', True),
+            ('edge(X,1)', 'edge(X,2)', False),
+            ('edge(X,1)', '~edge(X,1)', False),
+        ]):
+            literal, other, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_variant(Literal.parse(literal)) == get_variant(Literal.parse(other))
+
+                assert_that(result, 'get_variant(literal: Literal) -> Tuple:').is_equal_to(expected)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from assertpy import assert_that
+
+from foil.models import Literal
+from foil.models import Program
+from foil.utils import get_key
+from foil.utils import Info
+from foil.utils import Tabling
+
+
+class TablingTest(TestCase):
+
+    def test__call(self):
+        for i, entry in enumerate([
+            (None, [1, 2, 1, 3], Info(1, 3, None, 3)),
+            (2, [1, 2, 1, 3], Info(1, 3, 2, 2)),
+            (2, [1, 2, 3, 1], Info(0, 4, 2, 2)),
+            (0, [1, 1], Info(0, 2, 0, 0)),
+            (2, [[1], [1], {'X': 1}, {'X': 1}], Info(2, 2, 2, 2)),
+            (2, [[{}], [{}]], Info(1, 1, 2, 1)),
+        ]):
+            maxsize, calls, expected = entry
+            with self.subTest(i=i, value=entry):
+                tabling = Tabling(lambda x: [x], maxsize)
+                for call in calls:
+                    assert_that(tabling(call), 'Tabling.__call__(self, *args, **kwargs):').is_equal_to([call])
+
+                assert_that(tabling.info(), 'Tabling.info(self) -> Info:').is_equal_to(expected)
+
+    def test__clone(self):
+        tabling = Tabling(lambda x: [x])
+        result = tabling(1)
+        result.append(2)
+
+        assert_that(tabling(1), 'Tabling.__call__(self, *args, **kwargs):').is_equal_to([1])
+
+    def test__get_key(self):
+        for i, entry in enumerate([
+            (1, True, False),
+            (1, 1.0, False),
+            ({'X': 1, 'Y': 2}, {'Y': 2, 'X': 1}, True),
+            ([{'X': 1}], [{'X': 1}], True),
+            ([1, 2], (1, 2), False),
+            (Literal.parse('edge(0,1)'), Literal.parse('edge(0,1)'), True),
+            (Program.parse('edge(0,1). edge(1,2).'), Program.parse('edge(0,1). edge(1,2).'), True),
+            (Program.parse('edge(0,1). edge(1,2).'), Program.parse('edge(0,1).'), False),
+        ]):
+            value, other, expected = entry
+            with self.subTest(i=i, value=entry):
+                result = get_key(value) == get_key(other)
+
+                assert_that(result, 'get_key(value: Any) -> Hashable:').is_equal_to(expected)